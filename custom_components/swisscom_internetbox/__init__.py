@@ -1,38 +1,144 @@
 from __future__ import annotations
 
+import datetime as dt
+import functools
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 
-from .api import HostEntry, InternetBoxClient
+from .api import hosts_expression
+from .clients import async_get_clients
 from .const import (
+    CONF_ACTIVE_HOSTS_ONLY,
     CONF_HOST,
+    CONF_HOST_TRAFFIC,
+    CONF_HOSTS_EXPRESSION,
+    CONF_LEGACY_CLIENT,
+    CONF_MAX_PARALLEL_REQUESTS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
     CONF_PASSWORD,
+    CONF_PUSH_UPDATES,
+    CONF_RECONCILE_INTERVAL,
     CONF_SSL,
     CONF_VERIFY_SSL,
+    DEFAULT_ACTIVE_HOSTS_ONLY,
+    DEFAULT_HOST_TRAFFIC,
+    DEFAULT_HOSTS_EXPRESSION,
+    DEFAULT_LEGACY_CLIENT,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_POLL_INTERVAL_SECONDS,
+    DEFAULT_MIN_POLL_INTERVAL_SECONDS,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_RECONCILE_INTERVAL_SECONDS,
     DOMAIN,
+    ENDPOINT_INTERVALS,
     PLATFORMS,
+    SESSION_STORAGE_VERSION,
+    SNAPSHOT_STORAGE_VERSION,
 )
-from .coordinator import InternetBoxDataCoordinator
+from .coordinator import InternetBoxDataCoordinator, SnapshotStore
+from .events import InternetBoxEventListener
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    client = InternetBoxClient(
-        hass,
+    legacy_client = entry.options.get(CONF_LEGACY_CLIENT, DEFAULT_LEGACY_CLIENT)
+    # The client validated by the config flow, or used before a reload, is
+    # picked up with its session still open.
+    clients = async_get_clients(hass)
+    client = clients.async_acquire(
         host=entry.data[CONF_HOST],
         password=entry.data[CONF_PASSWORD],
         ssl=entry.data[CONF_SSL],
         verify_ssl=entry.data[CONF_VERIFY_SSL],
+        use_executor=legacy_client,
+    )
+    entry.async_on_unload(functools.partial(clients.async_release, client))
+    client.hosts_expression = hosts_expression(
+        entry.options.get(CONF_HOSTS_EXPRESSION, DEFAULT_HOSTS_EXPRESSION),
+        entry.options.get(CONF_ACTIVE_HOSTS_ONLY, DEFAULT_ACTIVE_HOSTS_ONLY),
     )
-    coordinator = InternetBoxDataCoordinator(hass, client)
-    await coordinator.async_config_entry_first_refresh()
+    client.scheduler.max_concurrency = entry.options.get(
+        CONF_MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
+    )
+    await client.async_set_session_store(_session_store(hass, entry))
+
+    # Pushed host events need the native client; with them enabled the host
+    # table is only polled on the slow reconcile interval.
+    push_updates = not legacy_client and entry.options.get(
+        CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES
+    )
+    intervals = {
+        key: dt.timedelta(seconds=entry.options.get(option, default))
+        for key, (option, default) in ENDPOINT_INTERVALS.items()
+    }
+    if push_updates:
+        intervals["devices"] = dt.timedelta(
+            seconds=entry.options.get(
+                CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL_SECONDS
+            )
+        )
+
+    coordinator = InternetBoxDataCoordinator(
+        hass,
+        client,
+        intervals=intervals,
+        snapshot_store=_snapshot_store(hass, entry),
+        min_interval=dt.timedelta(
+            seconds=entry.options.get(
+                CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL_SECONDS
+            )
+        ),
+        max_interval=dt.timedelta(
+            seconds=entry.options.get(
+                CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL_SECONDS
+            )
+        ),
+        host_traffic=entry.options.get(CONF_HOST_TRAFFIC, DEFAULT_HOST_TRAFFIC),
+    )
+
+    # With a snapshot from the previous run, entities are created from it right
+    # away and the first live refresh runs in the background.
+    if await coordinator.async_restore_snapshot():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh {client.host}"
+        )
+    else:
+        # A new entry: the config flow has just fetched the device information.
+        if client.device_info is not None:
+            coordinator.async_seed("device_info", client.device_info)
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(entry.add_update_listener(update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if push_updates:
+        listener = InternetBoxEventListener(client, coordinator)
+        entry.async_create_background_task(
+            hass, listener.async_run(), f"{DOMAIN} events {client.host}"
+        )
     return True
 
 
+def _session_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(
+        hass,
+        SESSION_STORAGE_VERSION,
+        f"{DOMAIN}.{entry.entry_id}.session",
+        private=True,
+    )
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return SnapshotStore(
+        hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot"
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
@@ -40,6 +146,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Log out and forget the persisted router session and snapshot."""
+    await async_get_clients(hass).async_close(entry.data[CONF_HOST])
+    await _session_store(hass, entry).async_remove()
+    await _snapshot_store(hass, entry).async_remove()
+
+
 async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(config_entry.entry_id)
@@ -50,7 +163,6 @@ async def async_remove_config_entry_device(
 ) -> bool:
     """Remove a device from a config entry."""
     coordinator: InternetBoxDataCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    data = coordinator.data or {}
 
     device_mac = None
     for connection in device_entry.connections:
@@ -61,12 +173,7 @@ async def async_remove_config_entry_device(
     if device_mac is None:
         return False
 
-    device: HostEntry = None
-    for d in data.get("devices", []):
-        if d.mac == device_mac:
-            device = d
-            break
-
+    device = coordinator.get_host(device_mac)
     if not device:
         return True
 
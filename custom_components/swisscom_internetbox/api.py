@@ -1,15 +1,66 @@
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import functools
+import importlib
 import json
+import logging
+import sys
+import time
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
 from dataclasses import dataclass
-from typing import Any
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
 
+import aiohttp
 from homeassistant.core import HomeAssistant
-from sc_inetbox_adapter import InternetboxAdapter
-from sc_inetbox_adapter.errors import NoActiveSessionException, SwisscomInetboxException
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util.json import json_loads
 
+from .const import (
+    DEFAULT_EVENTS_TIMEOUT_SECONDS,
+    DEFAULT_HOSTS_EXPRESSION,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+)
+from .errors import (
+    CannotConnectException,
+    EndpointNotFoundException,
+    NoActiveSessionException,
+    SwisscomInetboxException,
+)
+from .jsonstream import StatusArrayParser
+from .metrics import ClientMetrics
+from .scheduler import PRIORITY_TIMEOUTS, Priority, RequestScheduler
 
-@dataclass
+if TYPE_CHECKING:
+    from sc_inetbox_adapter import InternetboxAdapter
+
+_LOGGER = logging.getLogger(__name__)
+
+SAH_CONTENT_TYPE = "application/x-sah-ws-4-call+json"
+
+PATH_WS = "/ws"
+PATH_DEVICES = "/sysbus/Devices:get"
+PATH_DEVICE_INFO = "/sysbus/DeviceInfo:get"
+PATH_WAN_STATUS = "/sysbus/NMC:getWANStatus"
+PATH_DSL_STATS = "/sysbus/NeMo/Intf/dsl0:getDSLChannelStats"
+PATH_LAN_MIBS = "/sysbus/NeMo/Intf/lan:getMIBs"
+
+# Endpoints not listed are STATUS.
+ENDPOINT_PRIORITIES = {
+    PATH_DEVICES: Priority.PRESENCE,
+    PATH_DSL_STATS: Priority.DIAGNOSTICS,
+    PATH_LAN_MIBS: Priority.DIAGNOSTICS,
+}
+
+# Read size when streaming a response body into a parser.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True, slots=True)
 class HostEntry:
     mac: str
     ip: str | None
@@ -18,7 +69,467 @@ class HostEntry:
     type: str | None
 
 
-class InternetBoxClient(InternetboxAdapter):
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_mac(raw: str) -> str:
+    return sys.intern(raw.lower())
+
+
+def _normalize_active(active: Any) -> bool | None:
+    if isinstance(active, str):
+        return active.lower() in ("1", "true", "yes", "on")
+    if isinstance(active, (int, bool)):
+        return bool(active)
+    return None
+
+
+def parse_host(
+    d: Mapping[str, Any], previous: Mapping[str, HostEntry] | None = None
+) -> HostEntry | None:
+    """Build a HostEntry from a raw ``Devices`` object, if it has a MAC.
+
+    If ``previous`` holds an entry for the same MAC with identical fields, that
+    instance is returned instead of allocating a new one.
+    """
+    raw_mac = d.get("PhysAddress") or d.get("MACAddress") or d.get("mac")
+    if not raw_mac:
+        return None
+
+    mac = _normalize_mac(raw_mac)
+    ip = d.get("IPAddress") or d.get("IPAddress6") or d.get("ip")
+    hostname = d.get("Name") or d.get("HostName") or d.get("hostname")
+    active = _normalize_active(d["Active"] if "Active" in d else d.get("active"))
+    device_type = d.get("DeviceType")
+
+    if (
+        previous is not None
+        and (host := previous.get(mac)) is not None
+        and host.ip == ip
+        and host.hostname == hostname
+        and host.active is active
+        and host.type == device_type
+    ):
+        return host
+
+    return HostEntry(
+        mac=mac,
+        ip=ip,
+        hostname=_intern(hostname),
+        active=active,
+        type=_intern(device_type),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class BoxInfo:
+    """The fields of ``DeviceInfo:get`` the integration uses."""
+
+    serial_number: str | None = None
+    mac_address: str | None = None
+    model_name: str | None = None
+    hardware_version: str | None = None
+    software_version: str | None = None
+    uptime: int | None = None
+    external_ip: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class WanStatus:
+    """The fields of ``NMC:getWANStatus`` the integration uses."""
+
+    link_state: str | None = None
+    link_type: str | None = None
+    external_ip: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class DslStats:
+    """The byte counters of ``getDSLChannelStats``."""
+
+    bytes_received: int | None = None
+    bytes_sent: int | None = None
+
+
+def parse_box_info(response: Any) -> BoxInfo:
+    status = response.get("status") if isinstance(response, dict) else None
+    if not isinstance(status, dict):
+        raise SwisscomInetboxException(f"{PATH_DEVICE_INFO}: unexpected {response!r}")
+    return BoxInfo(
+        serial_number=status.get("SerialNumber"),
+        mac_address=status.get("MACAddress"),
+        model_name=status.get("ModelName"),
+        hardware_version=status.get("HardwareVersion"),
+        software_version=status.get("SoftwareVersion"),
+        uptime=status.get("UpTime"),
+        external_ip=status.get("ExternalIPAddress"),
+    )
+
+
+def parse_wan_status(response: Any) -> WanStatus:
+    data = (response.get("data") if isinstance(response, dict) else None) or {}
+    return WanStatus(
+        link_state=_intern(data.get("LinkState")),
+        link_type=_intern(data.get("LinkType")),
+        external_ip=data.get("IPAddress"),
+    )
+
+
+def parse_dsl_stats(response: Any) -> DslStats:
+    status = (response.get("status") if isinstance(response, dict) else None) or {}
+    stats = (status.get("stats") if isinstance(status, dict) else None) or {}
+    return DslStats(
+        bytes_received=stats.get("BytesReceived"),
+        bytes_sent=stats.get("BytesSent"),
+    )
+
+
+def apply_host_attributes(host: HostEntry, attributes: Mapping[str, Any]) -> HostEntry:
+    """Return ``host`` updated with the changed attributes of a device event."""
+    changes: dict[str, Any] = {}
+    if "Active" in attributes:
+        changes["active"] = _normalize_active(attributes["Active"])
+    if "IPAddress" in attributes:
+        changes["ip"] = attributes["IPAddress"] or None
+    if "Name" in attributes:
+        changes["hostname"] = _intern(attributes["Name"])
+    if "DeviceType" in attributes:
+        changes["type"] = _intern(attributes["DeviceType"])
+    return dataclasses.replace(host, **changes) if changes else host
+
+
+def hosts_expression(
+    expression: str = DEFAULT_HOSTS_EXPRESSION, active_only: bool = False
+) -> str:
+    """Sysbus expression for ``Devices:get``, optionally limited to active hosts.
+
+    Filtering on the box keeps hosts that are offline or long gone out of the
+    response, so the payload grows with the clients actually present rather
+    than with everything the box has ever seen.
+    """
+    expression = expression.strip() or DEFAULT_HOSTS_EXPRESSION
+    if active_only:
+        return f"({expression}) and .Active==true"
+    return expression
+
+
+def _is_auth_error(error: Any) -> bool:
+    text = str(error).lower()
+    return "authentication" in text or "permission denied" in text
+
+
+def _is_not_found_error(error: Any) -> bool:
+    # E.g. "Object or parameter not found" for dsl0 on a fiber box.
+    return "not found" in str(error).lower()
+
+
+def _check_response(path: str, response: Any) -> Any:
+    """Raise for sysbus error payloads, which come back with HTTP 200."""
+    errors = response.get("errors") if isinstance(response, dict) else None
+    if errors:
+        if _is_auth_error(errors):
+            raise NoActiveSessionException(f"{path}: {errors}")
+        if _is_not_found_error(errors):
+            raise EndpointNotFoundException(f"{path}: {errors}")
+        raise SwisscomInetboxException(f"{path}: {errors}")
+    return response
+
+
+def _raise_for_status(path: str, status: int) -> None:
+    if status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+        raise NoActiveSessionException(f"{path}: HTTP {status}")
+    if status == HTTPStatus.NOT_FOUND:
+        raise EndpointNotFoundException(f"{path}: HTTP {status}")
+    if status != HTTPStatus.OK:
+        raise SwisscomInetboxException(f"{path}: HTTP {status}")
+
+
+class SysbusTransport:
+    """Native asyncio transport for the sysbus JSON-RPC API.
+
+    Uses Home Assistant's shared aiohttp session, so requests never leave the
+    event loop. The session cookie is tracked per transport instead of relying
+    on the shared cookie jar, which rejects cookies for bare IP hosts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        password: str,
+        ssl: bool,
+        verify_ssl: bool,
+        metrics: ClientMetrics,
+    ):
+        self._session = async_get_clientsession(hass, verify_ssl=verify_ssl)
+        self._base_url = f"{'https' if ssl else 'http'}://{host}"
+        self._password = password
+        self._timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT_SECONDS)
+        self._context_id: str | None = None
+        self._cookies: dict[str, str] = {}
+        self._metrics = metrics
+
+    async def async_login(self) -> None:
+        payload = {
+            "service": "sah.Device.Information",
+            "method": "createContext",
+            "parameters": {
+                "applicationName": "webui",
+                "username": "admin",
+                "password": self._password,
+            },
+        }
+        status, body, cookies = await self._async_post(
+            PATH_WS, payload, {"Authorization": "X-Sah-Login"}
+        )
+        if status != HTTPStatus.OK:
+            raise SwisscomInetboxException(f"Login failed: HTTP {status}")
+
+        try:
+            self._context_id = body["data"]["contextID"]
+        except (KeyError, TypeError) as err:
+            raise SwisscomInetboxException("Login failed: no context ID") from err
+        self._cookies = cookies
+
+    async def async_logout(self) -> None:
+        if self._context_id is None:
+            return
+
+        payload = {
+            "service": "sah.Device.Information",
+            "method": "releaseContext",
+            "parameters": {"applicationName": "webui"},
+        }
+        headers = self._auth_headers()
+        headers["Authorization"] = f"X-Sah-Logout {self._context_id}"
+        try:
+            await self._async_post(PATH_WS, payload, headers)
+        finally:
+            self._context_id = None
+            self._cookies = {}
+
+    @property
+    def session_state(self) -> dict[str, Any] | None:
+        if self._context_id is None:
+            return None
+        return {"context_id": self._context_id, "cookies": dict(self._cookies)}
+
+    def restore_session(self, state: Mapping[str, Any]) -> None:
+        self._context_id = state["context_id"]
+        self._cookies = dict(state.get("cookies") or {})
+
+    async def async_call(
+        self,
+        path: str,
+        parameters: dict[str, Any],
+        parser: StatusArrayParser | None = None,
+    ) -> Any:
+        return await self._async_auth_post(
+            path, {"parameters": parameters}, parser=parser
+        )
+
+    async def async_read_events(
+        self, events: list[str], channel_id: int, timeout: float
+    ) -> Any:
+        """Long-poll the event channel until the box has events to deliver."""
+        return await self._async_auth_post(
+            PATH_WS, {"events": events, "channelid": channel_id}, timeout
+        )
+
+    async def _async_auth_post(
+        self,
+        path: str,
+        payload: dict[str, Any],
+        timeout: float | None = None,
+        parser: StatusArrayParser | None = None,
+    ) -> Any:
+        if self._context_id is None:
+            raise NoActiveSessionException
+
+        status, body, _ = await self._async_post(
+            path, payload, self._auth_headers(), timeout, parser
+        )
+        # A rejected session is dropped by the client, which can tell whether
+        # it is still the current one.
+        _raise_for_status(path, status)
+        return body
+
+    def _auth_headers(self) -> dict[str, str]:
+        headers = {"X-Context": self._context_id or ""}
+        if self._cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self._cookies.items())
+        return headers
+
+    async def _async_post(
+        self,
+        path: str,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+        timeout: float | None = None,
+        parser: StatusArrayParser | None = None,
+    ) -> tuple[int, Any, dict[str, str]]:
+        """POST a sysbus request and decode the response.
+
+        With a ``parser``, a successful response body is streamed through it
+        and never held in full; the body returned is what ``close()`` gives.
+        """
+        headers["Content-Type"] = SAH_CONTENT_TYPE
+        try:
+            async with self._session.post(
+                f"{self._base_url}{path}",
+                data=json.dumps(payload),
+                headers=headers,
+                timeout=(
+                    aiohttp.ClientTimeout(total=timeout) if timeout else self._timeout
+                ),
+            ) as response:
+                cookies = {name: m.value for name, m in response.cookies.items()}
+                status = response.status
+                if parser is not None and status == HTTPStatus.OK:
+                    parser.reset()
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        parser.feed(chunk)
+                    self._metrics.endpoint(path).record_payload(parser.size)
+                    return status, parser.close(), cookies
+                raw = await response.read()
+        except aiohttp.ClientConnectionError as err:
+            raise CannotConnectException(f"{path}: {err!r}") from err
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise SwisscomInetboxException(f"{path}: {err!r}") from err
+        except ValueError as err:
+            raise SwisscomInetboxException(f"{path}: invalid response") from err
+
+        self._metrics.endpoint(path).record_payload(len(raw))
+        # Error responses are often HTML pages; only their status matters.
+        if status != HTTPStatus.OK or not raw:
+            return status, None, cookies
+        try:
+            body = json_loads(raw)
+        except ValueError as err:
+            raise SwisscomInetboxException(f"{path}: invalid response") from err
+        return status, body, cookies
+
+
+class AdapterTransport:
+    """Fallback transport running the blocking ``sc_inetbox_adapter`` stack.
+
+    The adapter pulls in ``requests``, so it is only imported, in the import
+    executor, once the first request is made with this transport.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        password: str,
+        ssl: bool,
+        verify_ssl: bool,
+        metrics: ClientMetrics,
+    ):
+        self._hass = hass
+        self._adapter_args = {
+            "host": host,
+            "admin_password": password,
+            "ssl": ssl,
+            "verify_ssl": verify_ssl,
+        }
+        self._adapter: InternetboxAdapter | None = None
+        # Session restored before the adapter exists; applied on creation.
+        self._restored: Mapping[str, Any] | None = None
+        self._metrics = metrics
+
+    async def _async_get_adapter(self) -> InternetboxAdapter:
+        if self._adapter is None:
+            module = await self._hass.async_add_import_executor_job(
+                importlib.import_module, "sc_inetbox_adapter"
+            )
+            self._adapter = module.InternetboxAdapter(**self._adapter_args)
+            self._apply_restored_session()
+        return self._adapter
+
+    def _apply_restored_session(self) -> None:
+        if self._adapter is None or (state := self._restored) is None:
+            return
+        self._restored = None
+        self._adapter._auth_token = state["context_id"]
+        self._adapter._session.cookies.update(state.get("cookies") or {})
+
+    async def _async_run(self, path: str, func: Callable[[], Any]) -> Any:
+        """Run a blocking adapter call, raising errors of ``requests`` as ours."""
+
+        def _run() -> Any:
+            # Loaded along with the adapter.
+            import requests
+
+            try:
+                return func()
+            except requests.ConnectionError as err:
+                raise CannotConnectException(f"{path}: {err!r}") from err
+            except requests.RequestException as err:
+                raise SwisscomInetboxException(f"{path}: {err!r}") from err
+
+        return await self._hass.async_add_executor_job(_run)
+
+    async def async_login(self) -> None:
+        adapter = await self._async_get_adapter()
+        status = await self._async_run(PATH_WS, adapter.create_session)
+        if int(status) != HTTPStatus.OK:
+            raise SwisscomInetboxException(f"Login failed: HTTP {status}")
+
+    async def async_logout(self) -> None:
+        if self._adapter is None:
+            self._restored = None
+            return
+        await self._async_run(PATH_WS, self._adapter.logout_session)
+
+    @property
+    def session_state(self) -> dict[str, Any] | None:
+        if self._adapter is None:
+            return dict(self._restored) if self._restored is not None else None
+        if self._adapter._auth_token is None:
+            return None
+        return {
+            "context_id": self._adapter._auth_token,
+            "cookies": self._adapter._session.cookies.get_dict(),
+        }
+
+    def restore_session(self, state: Mapping[str, Any]) -> None:
+        self._restored = state
+        self._apply_restored_session()
+
+    async def async_call(
+        self,
+        path: str,
+        parameters: dict[str, Any],
+        parser: StatusArrayParser | None = None,
+    ) -> Any:
+        adapter = await self._async_get_adapter()
+        if adapter._auth_token is None:
+            raise NoActiveSessionException
+
+        def _call() -> Any:
+            headers = adapter._add_auth_header({})
+            payload = json.dumps({"parameters": parameters})
+            response = adapter._send_request(path, payload, headers)
+            self._metrics.endpoint(path).record_payload(len(response.content))
+            _raise_for_status(path, response.status_code)
+            try:
+                if parser is None:
+                    return response.json()
+                # requests has already read the whole body; the parser still
+                # saves building the full tree of host objects.
+                parser.reset()
+                parser.feed(response.content)
+                return parser.close()
+            except ValueError as err:
+                raise SwisscomInetboxException(f"{path}: invalid response") from err
+
+        return await self._async_run(path, _call)
+
+
+class InternetBoxClient:
     def __init__(
         self,
         hass: HomeAssistant,
@@ -26,99 +537,310 @@ class InternetBoxClient(InternetboxAdapter):
         password: str,
         ssl: bool = True,
         verify_ssl: bool = True,
+        use_executor: bool = False,
+        session_store: Store[dict[str, Any]] | None = None,
+        hosts_expression: str = DEFAULT_HOSTS_EXPRESSION,
+        max_age: float = 0,
+        max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS,
     ):
-        super().__init__(
-            host=host, admin_password=password, ssl=ssl, verify_ssl=verify_ssl
-        )
         self._hass = hass
+        self.metrics = ClientMetrics()
+        # The event long-poll bypasses the scheduler; it would hold a slot
+        # for as long as the box keeps it open.
+        self.scheduler = RequestScheduler(max_parallel_requests, self.metrics)
+        transport_cls = AdapterTransport if use_executor else SysbusTransport
+        self._transport: SysbusTransport | AdapterTransport = transport_cls(
+            hass, host, password, ssl, verify_ssl, self.metrics
+        )
+        self._host = host
+        self.hosts_expression = hosts_expression
         self._session_ready = False
+        self._session_generation = 0
+        self._login_lock = asyncio.Lock()
+        self._session_store = session_store
+        self._session_restored = session_store is None
+        # Last host table, so unchanged hosts keep their HostEntry instance.
+        self._hosts: dict[str, HostEntry] = {}
+        # Last device information fetched, e.g. while validating the config
+        # flow.
+        self.device_info: BoxInfo | None = None
+        # Seconds a successful status result is handed out again without a
+        # request.
+        self.max_age = max_age
+        self._in_flight: dict[Hashable, asyncio.Task[Any]] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
 
     async def async_ensure_session(self) -> None:
         if self._session_ready:
             return
 
-        def _login() -> None:
-            status = self.create_session()
-            if int(status) != 200:
-                raise SwisscomInetboxException(f"Login failed: HTTP {status}")
+        # Concurrent callers wait for a single login instead of each opening
+        # their own session on the box.
+        async with self._login_lock:
+            if self._session_ready:
+                return
+            if not self._session_restored:
+                self._session_restored = True
+                if await self._async_restore_session():
+                    return
+            await self._transport.async_login()
+            self.metrics.logins += 1
+            if self._session_generation:
+                self.metrics.relogins += 1
+            self._session_ready = True
+            self._session_generation += 1
+            await self._async_save_session()
+
+    async def async_set_session_store(self, store: Store[dict[str, Any]]) -> None:
+        """Persist the session in ``store`` from now on.
 
-        await self._hass.async_add_executor_job(_login)
+        An open session is saved right away; otherwise the next call tries the
+        session stored there before logging in.
+        """
+        self._session_store = store
+        self._session_restored = self._session_ready
+        await self._async_save_session()
+
+    async def _async_save_session(self) -> None:
+        if self._session_store is not None and self._session_ready:
+            await self._session_store.async_save(
+                {"host": self._host, **(self._transport.session_state or {})}
+            )
+
+    async def _async_restore_session(self) -> bool:
+        """Reuse the session persisted by a previous run.
+
+        The session is not validated here: if the box rejects it, the failing
+        call marks the session as gone and the next call logs in again.
+        """
+        assert self._session_store is not None
+        state = await self._session_store.async_load()
+        if not state or state.get("host") != self._host or not state.get("context_id"):
+            return False
+
+        self._transport.restore_session(state)
         self._session_ready = True
+        self._session_generation += 1
+        return True
 
     async def async_close(self) -> None:
         if not self._session_ready:
             return
 
-        await self._hass.async_add_executor_job(self.logout_session)
         self._session_ready = False
+        if self._session_store is not None:
+            await self._session_store.async_remove()
+        await self._transport.async_logout()
 
-    async def async_get_hosts(self) -> list[HostEntry]:
-        await self.async_ensure_session()
+    def _invalidate_session(self, generation: int) -> None:
+        # Only the first caller that sees a session rejected drops it; callers
+        # that failed on the same session then share the one re-login.
+        if generation == self._session_generation:
+            self._session_ready = False
+
+    async def _async_shared(
+        self,
+        path: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        cache: bool = False,
+    ) -> Any:
+        """Run ``fetch`` once for all concurrent callers asking for ``key``.
+
+        The box answers requests one at a time, so identical calls made while
+        one is in flight wait for its result instead of queueing their own.
+        With ``cache``, callers right after it get the same result for
+        ``max_age`` seconds. Callers share the result and must not modify it.
+        """
+        metrics = self.metrics.endpoint(path)
+        cache = cache and self.max_age > 0
+        if cache and (cached := self._results.get(key)) is not None:
+            fetched, result = cached
+            if time.monotonic() - fetched < self.max_age:
+                metrics.cached += 1
+                return result
+
+        if (task := self._in_flight.get(key)) is not None:
+            metrics.coalesced += 1
+        else:
 
-        def _get() -> Any:
-            return self.get_devices()
-
-        data = await self._hass.async_add_executor_job(_get)
-        if isinstance(data, dict) and "error" in data:
-            if "authentication" in str(data["error"]).lower():
-                raise NoActiveSessionException(data["error"])
-            raise SwisscomInetboxException(data["error"])
-
-        devices = []
-        for d in data:
-            mac = (
-                d.get("PhysAddress") or d.get("MACAddress") or d.get("mac") or ""
-            ).lower()
-            ip = d.get("IPAddress") or d.get("IPAddress6") or d.get("ip")
-            name = d.get("Name") or d.get("HostName") or d.get("hostname")
-            active = d.get("Active") or d.get("active")
-            device_type = d.get("DeviceType")
-
-            if isinstance(active, str):
-                active_norm = active.lower() in ("1", "true", "yes", "on")
-            elif isinstance(active, (int, bool)):
-                active_norm = bool(active)
-            else:
-                active_norm = None
-
-            if not mac:
-                continue
-
-            devices.append(
-                HostEntry(
-                    mac=mac, ip=ip, hostname=name, active=active_norm, type=device_type
-                )
+            async def _async_fetch() -> Any:
+                try:
+                    result = await fetch()
+                finally:
+                    del self._in_flight[key]
+                if cache:
+                    self._results[key] = (time.monotonic(), result)
+                return result
+
+            task = self._in_flight[key] = self._hass.async_create_task(
+                _async_fetch(), f"InternetBox {self._host} {path}"
             )
+        # A caller giving up does not cancel the request for the others.
+        return await asyncio.shield(task)
 
-        return devices
+    async def _async_call(
+        self,
+        path: str,
+        parameters: dict[str, Any],
+        parse: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """Call a sysbus endpoint, sharing identical calls in flight.
 
-    async def async_get_device_info(self) -> dict[str, Any]:
-        await self.async_ensure_session()
-        return await self._hass.async_add_executor_job(self.get_device_info)
+        With ``parse``, only its result is shared and cached; the raw response
+        is dropped as soon as it is parsed.
+        """
 
-    async def async_get_wan_info(self) -> dict[str, Any]:
-        await self.async_ensure_session()
+        async def _async_fetch() -> Any:
+            response = await self._async_request(path, parameters)
+            return response if parse is None else parse(response)
 
-        def _get():
-            headers = self._add_auth_header()
-            payload = json.dumps({"parameters": {}})
-            response = self._send_request("/sysbus/NMC:getWANStatus", payload, headers)
-            return response.json()
+        return await self._async_shared(
+            path,
+            (path, json.dumps(parameters, sort_keys=True)),
+            _async_fetch,
+            cache=True,
+        )
 
-        return await self._hass.async_add_executor_job(_get)
+    async def _async_request(
+        self,
+        path: str,
+        parameters: dict[str, Any],
+        parser: StatusArrayParser | None = None,
+    ) -> Any:
+        """Call a sysbus endpoint, re-authenticating once if the session expired."""
+        try:
+            return await self._async_call_once(path, parameters, parser)
+        except NoActiveSessionException:
+            _LOGGER.debug("Session rejected on %s, logging in again", path)
+        return await self._async_call_once(path, parameters, parser)
 
-    async def async_get_dsl_info(self) -> dict[str, Any]:
+    async def _async_call_once(
+        self,
+        path: str,
+        parameters: dict[str, Any],
+        parser: StatusArrayParser | None = None,
+    ) -> Any:
         await self.async_ensure_session()
+        generation = self._session_generation
+        metrics = self.metrics.endpoint(path)
+        priority = ENDPOINT_PRIORITIES.get(path, Priority.STATUS)
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(PRIORITY_TIMEOUTS[priority]):
+                async with self.scheduler.async_slot(priority):
+                    # Latency is measured from the box, not the queue.
+                    start = time.monotonic()
+                    response = _check_response(
+                        path,
+                        await self._transport.async_call(path, parameters, parser),
+                    )
+        except TimeoutError as err:
+            metrics.record_request(time.monotonic() - start, error=True)
+            raise SwisscomInetboxException(f"{path}: timed out") from err
+        except SwisscomInetboxException as err:
+            metrics.record_request(time.monotonic() - start, error=True)
+            if isinstance(err, NoActiveSessionException):
+                self._invalidate_session(generation)
+            raise
+        metrics.record_request(time.monotonic() - start, error=False)
+        return response
+
+    async def async_get_hosts(self) -> dict[str, HostEntry]:
+        """Fetch the hosts matching the client's expression.
 
-        def _get():
-            headers = self._add_auth_header()
-            payload = json.dumps({"parameters": {}})
-            response = self._send_request(
-                "/sysbus/NeMo/Intf/dsl0:getDSLChannelStats", payload, headers
+        The table is keyed by lower-case MAC address. The host objects are
+        parsed one by one while the response streams in, so neither the raw
+        body nor the decoded table is held in full. The table is never cached:
+        a reconcile after a pushed event has to see the box's current state.
+        """
+        return await self._async_shared(
+            PATH_DEVICES, (PATH_DEVICES, self.hosts_expression), self._async_fetch_hosts
+        )
+
+    async def _async_fetch_hosts(self) -> dict[str, HostEntry]:
+        devices: dict[str, HostEntry] = {}
+
+        def _add_host(d: Any) -> None:
+            if isinstance(d, dict) and (host := parse_host(d, self._hosts)):
+                devices[host.mac] = host
+
+        response = await self._async_request(
+            PATH_DEVICES,
+            {"expression": self.hosts_expression, "flags": "no_actions"},
+            StatusArrayParser(_add_host),
+        )
+        data = response.get("status") if isinstance(response, dict) else None
+        if not isinstance(data, list):
+            raise SwisscomInetboxException(f"{PATH_DEVICES}: unexpected {response!r}")
+
+        self._hosts = devices
+        return devices
+
+    async def async_get_events(
+        self, events: Sequence[str], channel_id: int = 0
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Wait for the next batch of sysbus events.
+
+        Pass ``channel_id=0`` to open a new channel; the returned channel ID
+        has to be passed back on the following calls.
+        """
+        if not isinstance(self._transport, SysbusTransport):
+            raise SwisscomInetboxException("Events require the native client")
+
+        await self.async_ensure_session()
+        generation = self._session_generation
+        try:
+            response = _check_response(
+                PATH_WS,
+                await self._transport.async_read_events(
+                    list(events), channel_id, DEFAULT_EVENTS_TIMEOUT_SECONDS
+                ),
             )
-            return response.json()
+        except NoActiveSessionException:
+            self._invalidate_session(generation)
+            raise
+        if not isinstance(response, dict) or "channelid" not in response:
+            raise SwisscomInetboxException(f"{PATH_WS}: unexpected {response!r}")
+
+        return response["channelid"], [
+            event["data"] for event in response.get("events") or [] if "data" in event
+        ]
+
+    async def async_get_device_info(self) -> BoxInfo:
+        self.device_info = await self._async_call(PATH_DEVICE_INFO, {}, parse_box_info)
+        return self.device_info
+
+    async def async_get_wan_info(self) -> WanStatus:
+        return await self._async_call(PATH_WAN_STATUS, {}, parse_wan_status)
+
+    async def async_get_dsl_info(self) -> DslStats:
+        return await self._async_call(PATH_DSL_STATS, {}, parse_dsl_stats)
+
+    async def async_get_host_traffic(self) -> dict[str, tuple[int, int]]:
+        """Fetch the byte counters of every Wi-Fi station in one call.
+
+        Returns ``(received, sent)`` from the host's point of view, keyed by
+        lower-case MAC. Wired hosts have no per-host counters on the box.
+        """
+        response = await self._async_call(
+            PATH_LAN_MIBS, {"mibs": "wlanvap", "traverse": "down"}
+        )
+        status = response.get("status") if isinstance(response, dict) else None
+        vaps = (status or {}).get("wlanvap") or {}
 
-        return await self._hass.async_add_executor_job(_get)
+        traffic = {}
+        for vap in vaps.values():
+            stations = vap.get("AssociatedDevice") or {}
+            if isinstance(stations, dict):
+                stations = stations.values()
+            for station in stations:
+                mac = station.get("MACAddress")
+                # The access point's Tx is the station's download.
+                received, sent = station.get("TxBytes"), station.get("RxBytes")
+                if mac and isinstance(received, int) and isinstance(sent, int):
+                    traffic[_normalize_mac(mac)] = (received, sent)
+        return traffic
 
     @property
     def host(self) -> str:
@@ -0,0 +1,56 @@
+"""Circuit breakers that stop polling endpoints which keep failing."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# Consecutive failures after which an endpoint is skipped.
+BREAKER_FAILURES = 3
+# First cooling period, doubled each time the trial request after it fails.
+BREAKER_COOLDOWN_SECONDS = 300
+BREAKER_MAX_COOLDOWN_SECONDS = 6 * 3600
+
+
+@dataclass(slots=True)
+class CircuitBreaker:
+    """Failure state of one endpoint.
+
+    Closed while the endpoint works. After ``BREAKER_FAILURES`` failures in a
+    row, or at once for an endpoint the box does not have, it opens and the
+    endpoint is skipped until the cooling period is over. The next refresh
+    then makes a single trial request: on success the coordinator drops the
+    breaker, on failure it opens again for twice as long.
+    """
+
+    failures: int = 0
+    trips: int = 0
+    open_until: float | None = None
+
+    def allows(self, now: float) -> bool:
+        return self.open_until is None or now >= self.open_until
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_until is not None
+
+    def record_failure(self, now: float, permanent: bool = False) -> float | None:
+        """Count a failure; return the cooling period if the breaker opened."""
+        self.failures += 1
+        # A failed trial request reopens at once.
+        if not (permanent or self.is_open or self.failures >= BREAKER_FAILURES):
+            return None
+        cooldown: float = min(
+            BREAKER_COOLDOWN_SECONDS * 2**self.trips, BREAKER_MAX_COOLDOWN_SECONDS
+        )
+        self.trips += 1
+        self.open_until = now + cooldown
+        return cooldown
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        return {
+            "failures": self.failures,
+            "open_for": (
+                max(0.0, self.open_until - now) if self.open_until is not None else None
+            ),
+        }
@@ -0,0 +1,138 @@
+"""Clients shared by the config flow and the config entries, one per host."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import InternetBoxClient
+from .const import (
+    CLIENT_LINGER_SECONDS,
+    CLIENT_MAX_AGE_SECONDS,
+    DATA_CLIENTS,
+    DOMAIN,
+)
+
+
+@dataclass(slots=True)
+class _Registration:
+    client: InternetBoxClient
+    # Connection settings the client was created with.
+    settings: tuple[str, bool, bool, bool]
+    users: int = 0
+    cancel_close: CALLBACK_TYPE | None = None
+
+
+class ClientRegistry:
+    """Hand out one logged-in client per host.
+
+    A client released by its last user lingers for ``CLIENT_LINGER_SECONDS``
+    before its session is closed, so the entry set up right after a config
+    flow, or set up again by a reload, reuses the session instead of logging
+    in again. Clients still lingering when Home Assistant stops are left open,
+    as the sessions of loaded entries are, so they can be restored.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._clients: dict[str, _Registration] = {}
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    @callback
+    def async_acquire(
+        self,
+        host: str,
+        password: str,
+        ssl: bool,
+        verify_ssl: bool,
+        use_executor: bool = False,
+    ) -> InternetBoxClient:
+        """Return the client for ``host``, creating it if needed."""
+        settings = (password, ssl, verify_ssl, use_executor)
+        registration = self._clients.get(host)
+        if registration is not None and registration.settings != settings:
+            # Settings changed: whoever still holds the old client closes it on
+            # release; an unused one is closed now.
+            self._async_forget(host, close=registration.users == 0)
+            registration = None
+
+        if registration is None:
+            client = InternetBoxClient(
+                self._hass,
+                host=host,
+                password=password,
+                ssl=ssl,
+                verify_ssl=verify_ssl,
+                use_executor=use_executor,
+                max_age=CLIENT_MAX_AGE_SECONDS,
+            )
+            registration = self._clients[host] = _Registration(client, settings)
+
+        if registration.cancel_close is not None:
+            registration.cancel_close()
+            registration.cancel_close = None
+        registration.users += 1
+        return registration.client
+
+    @callback
+    def async_release(self, client: InternetBoxClient) -> None:
+        """Give up a client; its session is closed once nobody uses it."""
+        registration = self._clients.get(client.host)
+        if registration is None or registration.client is not client:
+            # Replaced while in use; nobody else can acquire it any more.
+            self._async_close(client)
+            return
+
+        registration.users -= 1
+        if registration.users > 0:
+            return
+
+        @callback
+        def _async_expire(_now: object) -> None:
+            registration.cancel_close = None
+            self._async_forget(client.host, close=True)
+
+        registration.cancel_close = async_call_later(
+            self._hass, CLIENT_LINGER_SECONDS, _async_expire
+        )
+
+    async def async_close(self, host: str) -> None:
+        """Close the session of an unused client right away."""
+        registration = self._clients.get(host)
+        if registration is None or registration.users > 0:
+            return
+        if registration.cancel_close is not None:
+            registration.cancel_close()
+        del self._clients[host]
+        await registration.client.async_close()
+
+    @callback
+    def _async_forget(self, host: str, close: bool) -> None:
+        registration = self._clients.pop(host)
+        if registration.cancel_close is not None:
+            registration.cancel_close()
+        if close:
+            self._async_close(registration.client)
+
+    @callback
+    def _async_close(self, client: InternetBoxClient) -> None:
+        self._hass.async_create_task(
+            client.async_close(), f"{DOMAIN} close {client.host}"
+        )
+
+    @callback
+    def _async_stop(self, _event: Event) -> None:
+        for registration in self._clients.values():
+            if registration.cancel_close is not None:
+                registration.cancel_close()
+                registration.cancel_close = None
+
+
+@callback
+def async_get_clients(hass: HomeAssistant) -> ClientRegistry:
+    if (clients := hass.data.get(DATA_CLIENTS)) is None:
+        clients = hass.data[DATA_CLIENTS] = ClientRegistry(hass)
+    return clients
@@ -8,19 +8,38 @@ from homeassistant.config_entries import ConfigEntry, ConfigFlow
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 
-from .api import InternetBoxClient
+from .clients import async_get_clients
 from .const import (
+    CONF_ACTIVE_HOSTS_ONLY,
     CONF_CONSIDER_HOME,
     CONF_HOST,
+    CONF_HOST_TRAFFIC,
+    CONF_HOSTS_EXPRESSION,
+    CONF_LEGACY_CLIENT,
+    CONF_MAX_PARALLEL_REQUESTS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
     CONF_PASSWORD,
+    CONF_PUSH_UPDATES,
+    CONF_RECONCILE_INTERVAL,
     CONF_SSL,
     CONF_VERIFY_SSL,
+    DEFAULT_ACTIVE_HOSTS_ONLY,
     DEFAULT_CONSIDER_HOME,
     DEFAULT_HOST_NAME,
+    DEFAULT_HOST_TRAFFIC,
+    DEFAULT_HOSTS_EXPRESSION,
+    DEFAULT_LEGACY_CLIENT,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_POLL_INTERVAL_SECONDS,
+    DEFAULT_MIN_POLL_INTERVAL_SECONDS,
     DEFAULT_NAME,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_RECONCILE_INTERVAL_SECONDS,
     DEFAULT_SSL,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    ENDPOINT_INTERVALS,
 )
 
 
@@ -53,26 +72,98 @@ def _ordered_shared_schema(schema_input):
     }
 
 
-class OptionsFlowHandler(config_entries.ConfigFlow):
+class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: ConfigEntry):
         self._config_entry = config_entry
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        errors: dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            min_interval = user_input.get(
+                CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL_SECONDS
+            )
+            max_interval = user_input.get(
+                CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL_SECONDS
+            )
+            if min_interval > max_interval:
+                errors[CONF_MAX_POLL_INTERVAL] = "max_below_min"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        # Shown again after an error, the form keeps what was entered.
+        options = {**self._config_entry.options, **(user_input or {})}
 
         settings_schema = vol.Schema(
             {
                 vol.Optional(
                     CONF_CONSIDER_HOME,
-                    default=self._config_entry.options.get(
+                    default=options.get(
                         CONF_CONSIDER_HOME, DEFAULT_CONSIDER_HOME.total_seconds()
                     ),
-                ): int
+                ): int,
+                vol.Optional(
+                    CONF_LEGACY_CLIENT,
+                    default=options.get(CONF_LEGACY_CLIENT, DEFAULT_LEGACY_CLIENT),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_MAX_PARALLEL_REQUESTS,
+                    default=options.get(
+                        CONF_MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+                vol.Optional(
+                    CONF_PUSH_UPDATES,
+                    default=options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_RECONCILE_INTERVAL,
+                    default=options.get(
+                        CONF_RECONCILE_INTERVAL, DEFAULT_RECONCILE_INTERVAL_SECONDS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                vol.Optional(
+                    CONF_HOST_TRAFFIC,
+                    default=options.get(CONF_HOST_TRAFFIC, DEFAULT_HOST_TRAFFIC),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_MIN_POLL_INTERVAL,
+                    default=options.get(
+                        CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL_SECONDS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MAX_POLL_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL_SECONDS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Optional(
+                    CONF_HOSTS_EXPRESSION,
+                    default=options.get(
+                        CONF_HOSTS_EXPRESSION, DEFAULT_HOSTS_EXPRESSION
+                    ),
+                ): cv.string,
+                vol.Optional(
+                    CONF_ACTIVE_HOSTS_ONLY,
+                    default=options.get(
+                        CONF_ACTIVE_HOSTS_ONLY, DEFAULT_ACTIVE_HOSTS_ONLY
+                    ),
+                ): cv.boolean,
+            }
+        )
+        settings_schema = settings_schema.extend(
+            {
+                vol.Optional(
+                    option,
+                    default=options.get(option, default),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5))
+                for option, default in ENDPOINT_INTERVALS.values()
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=settings_schema)
+        return self.async_show_form(
+            step_id="init", data_schema=settings_schema, errors=errors
+        )
 
 
 class SwisscomFlowHandler(ConfigFlow, domain=DOMAIN):
@@ -120,9 +211,10 @@ class SwisscomFlowHandler(ConfigFlow, domain=DOMAIN):
         verify_ssl = user_input.get(CONF_VERIFY_SSL, self.placeholders[CONF_VERIFY_SSL])
         password = user_input[CONF_PASSWORD]
 
-        client = InternetBoxClient(
-            hass=self.hass, host=host, password=password, ssl=ssl, verify_ssl=verify_ssl
-        )
+        # Released when the flow is done, the client stays logged in for a
+        # while so the entry set up next reuses its session.
+        clients = async_get_clients(self.hass)
+        client = clients.async_acquire(host, password, ssl, verify_ssl)
 
         config_data = {
             CONF_PASSWORD: password,
@@ -133,23 +225,18 @@ class SwisscomFlowHandler(ConfigFlow, domain=DOMAIN):
 
         try:
             info = await client.async_get_device_info()
-            if info is None:
-                errors["base"] = info
-                return await self._show_setup_form(user_input, errors)
         except Exception:
             errors["base"] = "Could not login to InternetBox"
             return await self._show_setup_form(user_input, errors)
-
-        await self.async_set_unique_id(info["SerialNumber"], raise_on_progress=False)
+        finally:
+            clients.async_release(client)
+        await self.async_set_unique_id(info.serial_number, raise_on_progress=False)
         self._abort_if_unique_id_configured(updates=config_data)
 
-        if (
-            info.get("ModelName") is not None
-            and info.get("HardwareVersion") is not None
-        ):
-            name = f"{info['ModelName']} - {info['HardwareVersion']}"
+        if info.model_name is not None and info.hardware_version is not None:
+            name = f"{info.model_name} - {info.hardware_version}"
         else:
-            name = info.get("ModelName", DEFAULT_NAME)
+            name = info.model_name or DEFAULT_NAME
 
         return self.async_create_entry(
             title=name,
@@ -10,6 +10,18 @@ CONF_PASSWORD = "password"
 CONF_SSL = "ssl"
 CONF_VERIFY_SSL = "verify_ssl"
 
+# hass.data key of the client registry shared by flows and entries.
+DATA_CLIENTS = f"{DOMAIN}_clients"
+# How long a client nobody uses keeps its session open, in seconds.
+CLIENT_LINGER_SECONDS = 30
+# How long a client hands a status result out again instead of asking the box,
+# e.g. to the first refresh after a reload. Shorter than any poll interval.
+CLIENT_MAX_AGE_SECONDS = 2
+
+SESSION_STORAGE_VERSION = 1
+SNAPSHOT_STORAGE_VERSION = 2
+SNAPSHOT_SAVE_DELAY_SECONDS = 60
+
 DEFAULT_HOST_NAME = "internetbox.swisscom.ch"
 DEFAULT_NAME = "Swisscom InternetBox"
 DEFAULT_SSL = True
@@ -18,7 +30,56 @@ DEFAULT_VERIFY_SSL = True
 CONF_CONSIDER_HOME = "consider_home"
 DEFAULT_CONSIDER_HOME = dt.timedelta(seconds=180)
 
-DEFAULT_POLL_INTERVAL_SECONDS = 30
+CONF_HOSTS_INTERVAL = "hosts_interval"
+CONF_WAN_INTERVAL = "wan_interval"
+CONF_DSL_INTERVAL = "dsl_interval"
+CONF_DEVICE_INFO_INTERVAL = "device_info_interval"
+CONF_HOST_TRAFFIC_INTERVAL = "host_traffic_interval"
+DEFAULT_HOSTS_INTERVAL_SECONDS = 15
+DEFAULT_WAN_INTERVAL_SECONDS = 30
+DEFAULT_DSL_INTERVAL_SECONDS = 60
+DEFAULT_DEVICE_INFO_INTERVAL_SECONDS = 600
+DEFAULT_HOST_TRAFFIC_INTERVAL_SECONDS = 60
+
+# Coordinator data key -> (options key, default polling interval in seconds)
+ENDPOINT_INTERVALS = {
+    "devices": (CONF_HOSTS_INTERVAL, DEFAULT_HOSTS_INTERVAL_SECONDS),
+    "wan_info": (CONF_WAN_INTERVAL, DEFAULT_WAN_INTERVAL_SECONDS),
+    "dsl_info": (CONF_DSL_INTERVAL, DEFAULT_DSL_INTERVAL_SECONDS),
+    "device_info": (CONF_DEVICE_INFO_INTERVAL, DEFAULT_DEVICE_INFO_INTERVAL_SECONDS),
+    "host_traffic": (
+        CONF_HOST_TRAFFIC_INTERVAL,
+        DEFAULT_HOST_TRAFFIC_INTERVAL_SECONDS,
+    ),
+}
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+DEFAULT_MIN_POLL_INTERVAL_SECONDS = 5
+DEFAULT_MAX_POLL_INTERVAL_SECONDS = 300
+
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 10
+DEFAULT_EVENTS_TIMEOUT_SECONDS = 90
+
+CONF_PUSH_UPDATES = "push_updates"
+DEFAULT_PUSH_UPDATES = False
+CONF_RECONCILE_INTERVAL = "reconcile_interval"
+DEFAULT_RECONCILE_INTERVAL_SECONDS = 300
+
+CONF_MAX_PARALLEL_REQUESTS = "max_parallel_requests"
+DEFAULT_MAX_PARALLEL_REQUESTS = 4
+
+CONF_HOST_TRAFFIC = "host_traffic"
+DEFAULT_HOST_TRAFFIC = False
+
+# Sysbus expression selecting the hosts to fetch: end devices on the LAN
+# (wired and Wi-Fi), leaving out the box itself and its interfaces.
+CONF_HOSTS_EXPRESSION = "hosts_expression"
+DEFAULT_HOSTS_EXPRESSION = "lan and edev and not self"
+CONF_ACTIVE_HOSTS_ONLY = "active_hosts_only"
+DEFAULT_ACTIVE_HOSTS_ONLY = False
+
+CONF_LEGACY_CLIENT = "legacy_client"
+DEFAULT_LEGACY_CLIENT = False
 
 DEVICE_ICONS = {
     "iphone": "mdi:cellphone",
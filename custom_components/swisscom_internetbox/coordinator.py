@@ -1,43 +1,622 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
 import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import asdict, dataclass, field, fields
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from sc_inetbox_adapter.errors import NoActiveSessionException
 
-from .api import InternetBoxClient
-from .const import DEFAULT_POLL_INTERVAL_SECONDS, DOMAIN
+from .api import (
+    BoxInfo,
+    DslStats,
+    HostEntry,
+    InternetBoxClient,
+    WanStatus,
+    apply_host_attributes,
+    parse_box_info,
+    parse_dsl_stats,
+    parse_host,
+    parse_wan_status,
+)
+from .breaker import CircuitBreaker
+from .const import (
+    DEFAULT_MAX_POLL_INTERVAL_SECONDS,
+    DEFAULT_MIN_POLL_INTERVAL_SECONDS,
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    DOMAIN,
+    ENDPOINT_INTERVALS,
+    SNAPSHOT_SAVE_DELAY_SECONDS,
+)
+from .errors import (
+    CannotConnectException,
+    EndpointNotFoundException,
+    NoActiveSessionException,
+)
+from .rates import ByteRate, HostTrafficRates
+from .scheduler import PRIORITY_TIMEOUTS
+
+if TYPE_CHECKING:
+    from .events import HostEvent
 
 _LOGGER = logging.getLogger(__name__)
 
+_HOST_FIELDS = tuple(f.name for f in fields(HostEntry))
+# Data keys holding one parsed payload each, and their types.
+_PAYLOAD_TYPES: dict[str, type[BoxInfo | WanStatus | DslStats]] = {
+    "device_info": BoxInfo,
+    "wan_info": WanStatus,
+    "dsl_info": DslStats,
+}
+
+# A refresh slower than this counts as a failure for the backoff.
+SLOW_REFRESH_SECONDS = DEFAULT_REQUEST_TIMEOUT_SECONDS / 2
+# Overall time a refresh may take; endpoints still running are given up. It
+# outlasts the slowest request timeout, so the client gives up (and counts)
+# timed out requests itself.
+REFRESH_BUDGET_SECONDS = max(PRIORITY_TIMEOUTS.values()) + SLOW_REFRESH_SECONDS
+BACKOFF_JITTER = 0.2
+BACKOFF_MAX_LEVEL = 10
+# How long the host table is polled at the minimum interval after it changed.
+ACCELERATION_SECONDS = 120
+# Without host changes for this long, every interval is stretched.
+QUIET_SECONDS = 600
+QUIET_FACTOR = 2.0
+
+
+def host_topic(mac: str) -> str:
+    """Listener context topic for changes to a single host."""
+    return f"devices/{mac}"
+
+
+def host_traffic_topic(mac: str) -> str:
+    """Listener context topic for changes to the traffic rates of a host."""
+    return f"host_traffic/{mac}"
+
+
+@dataclass(frozen=True)
+class HostDelta:
+    """Per-MAC difference between two host tables."""
+
+    added: frozenset[str] = frozenset()
+    removed: frozenset[str] = frozenset()
+    changed: Mapping[str, frozenset[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def topics(self) -> set[str]:
+        if not self:
+            return set()
+        macs = self.added | self.removed | self.changed.keys()
+        return {"devices", *(host_topic(mac) for mac in macs)}
+
+
+def diff_hosts(
+    old: Mapping[str, HostEntry] | None, new: Mapping[str, HostEntry] | None
+) -> HostDelta:
+    old_by_mac = old or {}
+    new_by_mac = new or {}
+
+    changed = {}
+    for mac, host in new_by_mac.items():
+        previous = old_by_mac.get(mac)
+        if previous is None or previous is host or previous == host:
+            continue
+        changed[mac] = frozenset(
+            name
+            for name in _HOST_FIELDS
+            if getattr(previous, name) != getattr(host, name)
+        )
+
+    return HostDelta(
+        added=frozenset(new_by_mac.keys() - old_by_mac.keys()),
+        removed=frozenset(old_by_mac.keys() - new_by_mac.keys()),
+        changed=changed,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class InternetBoxSummary:
+    """Values the sensors read, derived once per refresh."""
+
+    connected_devices: int = 0
+    online_devices: int = 0
+    sw_version: str | None = None
+    model: str | None = None
+    uptime: int | None = None
+    external_ip: str | None = None
+    wan_rx: int | None = None
+    wan_tx: int | None = None
+    wan_rx_rate: int | None = None
+    wan_tx_rate: int | None = None
+    link_state: str | None = None
+    link_type: str | None = None
+
+
+def dsl_counters(data: Mapping[str, Any]) -> tuple[int | None, int | None]:
+    """Received and sent byte counters of the DSL line."""
+    stats: DslStats = data.get("dsl_info") or DslStats()
+    return stats.bytes_received, stats.bytes_sent
+
+
+def build_summary(
+    data: Mapping[str, Any],
+    wan_rx_rate: int | None = None,
+    wan_tx_rate: int | None = None,
+) -> InternetBoxSummary:
+    hosts: Mapping[str, HostEntry] = data.get("devices") or {}
+    device_info: BoxInfo = data.get("device_info") or BoxInfo()
+    wan: WanStatus = data.get("wan_info") or WanStatus()
+    wan_rx, wan_tx = dsl_counters(data)
+
+    return InternetBoxSummary(
+        connected_devices=len(hosts),
+        online_devices=sum(1 for host in hosts.values() if host.active),
+        sw_version=device_info.software_version,
+        model=device_info.model_name,
+        uptime=device_info.uptime,
+        # The WAN status is polled far more often than the device info.
+        external_ip=wan.external_ip,
+        wan_rx=wan_rx,
+        wan_tx=wan_tx,
+        wan_rx_rate=wan_rx_rate,
+        wan_tx_rate=wan_tx_rate,
+        link_state=wan.link_state,
+        link_type=wan.link_type,
+    )
+
+
+class SnapshotStore(Store[dict[str, Any]]):
+    """Storage of the coordinator snapshot.
+
+    Version 1 snapshots hold the raw responses of the box; they are reduced
+    to the fields the coordinator keeps.
+    """
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict
+    ) -> dict[str, Any]:
+        if old_major_version == 1:
+            device_info = old_data.get("device_info")
+            wan_info = old_data.get("wan_info")
+            dsl_info = old_data.get("dsl_info")
+            old_data = {
+                **old_data,
+                "device_info": device_info
+                and asdict(parse_box_info({"status": device_info})),
+                "wan_info": wan_info and asdict(parse_wan_status(wan_info)),
+                "dsl_info": dsl_info and asdict(parse_dsl_stats(dsl_info)),
+            }
+        return old_data
+
 
 class InternetBoxDataCoordinator(DataUpdateCoordinator[dict]):
-    def __init__(self, hass: HomeAssistant, client: InternetBoxClient):
+    """Poll every endpoint of the box on its own interval.
+
+    The coordinator ticks at the shortest effective interval and only fetches
+    the endpoints that are due. Intervals adapt within the configured bounds:
+    they back off exponentially while the box fails or is slow, the host table
+    is polled at the minimum interval for a while after it changed, and every
+    interval is stretched after a long quiet period. An endpoint that keeps
+    failing while the others work, or that the box does not have, is skipped
+    by its circuit breaker for a cooling period, and a refresh never takes
+    longer than ``REFRESH_BUDGET_SECONDS``. Entities pass the set of
+    topics they read as their coordinator context (data keys, or
+    ``host_topic(mac)`` for a single host) and are only notified when one of
+    those topics changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: InternetBoxClient,
+        intervals: Mapping[str, dt.timedelta] | None = None,
+        snapshot_store: Store[dict[str, Any]] | None = None,
+        min_interval: dt.timedelta | None = None,
+        max_interval: dt.timedelta | None = None,
+        host_traffic: bool = False,
+    ):
+        self._intervals = {
+            key: dt.timedelta(seconds=default)
+            for key, (_, default) in ENDPOINT_INTERVALS.items()
+        }
+        self._intervals.update(intervals or {})
+        # Per-host traffic is an extra request the box is only asked for on
+        # demand.
+        if not host_traffic:
+            del self._intervals["host_traffic"]
+
         super().__init__(
             hass,
             logger=_LOGGER,
             name=DOMAIN,
-            update_interval=dt.timedelta(seconds=DEFAULT_POLL_INTERVAL_SECONDS),
+            update_interval=min(self._intervals.values()),
         )
         self._client = client
+        self._last_fetched: dict[str, float] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._min_interval = (
+            min_interval or dt.timedelta(seconds=DEFAULT_MIN_POLL_INTERVAL_SECONDS)
+        ).total_seconds()
+        self._max_interval = (
+            max_interval or dt.timedelta(seconds=DEFAULT_MAX_POLL_INTERVAL_SECONDS)
+        ).total_seconds()
+        # Multiplier applied to every interval; above 1 while backing off or
+        # quiet.
+        self._scale = 1.0
+        self._backoff_level = 0
+        self._accelerate_until: float | None = None
+        self._last_host_change: float | None = None
+        self._updated_topics: frozenset[str] | None = None
+        self.host_delta = HostDelta()
+        self.summary = InternetBoxSummary()
+        self._wan_rx_rate = ByteRate()
+        self._wan_tx_rate = ByteRate()
+        self.host_traffic_rates = HostTrafficRates()
+        self._snapshot_store = snapshot_store
+        # True while the data comes from the persisted snapshot rather than the
+        # box itself.
+        self.stale = False
+        self.endpoint_durations: dict[str, float] = {}
+        self.refresh_duration: float | None = None
 
-    async def _async_update_data(self) -> dict:
+    @property
+    def client(self) -> InternetBoxClient:
+        return self._client
+
+    @property
+    def hosts(self) -> Mapping[str, HostEntry]:
+        """Current host table, keyed by lower-case MAC address."""
+        return (self.data or {}).get("devices") or {}
+
+    def get_host(self, mac: str) -> HostEntry | None:
+        return self.hosts.get(mac.lower())
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last snapshot saved by a previous run as stale data."""
+        if self._snapshot_store is None:
+            return False
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot:
+            return False
+
+        data: dict[str, Any] = dict.fromkeys(self._endpoints())
+        for key, payload_type in _PAYLOAD_TYPES.items():
+            if value := snapshot.get(key):
+                data[key] = payload_type(**value)
+        data["devices"] = {
+            host["mac"]: HostEntry(**host) for host in snapshot.get("devices") or []
+        }
+        self.data = data
+        self.summary = self._build_summary(data)
+        self.stale = True
+        return True
+
+    @callback
+    def async_seed(self, key: str, value: Any) -> None:
+        """Take data fetched elsewhere, such as by the config flow, as fresh."""
+        data = dict(self.data or dict.fromkeys(self._endpoints()))
+        data[key] = value
+        self.data = data
+        self.summary = self._build_summary(data)
+        self._last_fetched[key] = time.monotonic()
+
+    @callback
+    def _snapshot(self) -> dict[str, Any]:
+        data = self.data or {}
+        # Traffic counters are useless without the previous sample, so they
+        # are not persisted.
+        return {
+            **{
+                key: None if (value := data.get(key)) is None else asdict(value)
+                for key in _PAYLOAD_TYPES
+            },
+            "devices": [asdict(host) for host in self.hosts.values()],
+        }
+
+    def _build_summary(self, data: Mapping[str, Any]) -> InternetBoxSummary:
+        return build_summary(data, self._wan_rx_rate.rate, self._wan_tx_rate.rate)
+
+    @property
+    def host_traffic(self) -> bool:
+        return "host_traffic" in self._intervals
+
+    def _endpoints(self) -> dict[str, Callable[[], Awaitable[Any]]]:
+        endpoints: dict[str, Callable[[], Awaitable[Any]]] = {
+            "devices": self._client.async_get_hosts,
+            "device_info": self._client.async_get_device_info,
+            "wan_info": self._client.async_get_wan_info,
+            "dsl_info": self._client.async_get_dsl_info,
+        }
+        if self.host_traffic:
+            endpoints["host_traffic"] = self._client.async_get_host_traffic
+        return endpoints
+
+    def _interval(self, key: str, now: float) -> float:
+        """Current polling interval of an endpoint, in seconds."""
+        base = self._intervals[key].total_seconds()
+        if self._scale > 1:
+            # Stretch up to the maximum, but never below the configured value.
+            return max(base, min(base * self._scale, self._max_interval))
+        if (
+            key == "devices"
+            and self._accelerate_until is not None
+            and now < self._accelerate_until
+        ):
+            return min(base, self._min_interval)
+        return base
+
+    def _adapt_intervals(self, now: float, failed: bool) -> None:
+        """Pick the scale and tick for the next refresh after one finished."""
+        if failed or (self.refresh_duration or 0) > SLOW_REFRESH_SECONDS:
+            self._backoff_level = min(self._backoff_level + 1, BACKOFF_MAX_LEVEL)
+            jitter = random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+            self._scale = 2**self._backoff_level * jitter
+        else:
+            self._backoff_level = 0
+            quiet = (
+                self._last_host_change is not None
+                and now - self._last_host_change >= QUIET_SECONDS
+            )
+            self._scale = QUIET_FACTOR if quiet else 1.0
+
+        self.update_interval = dt.timedelta(
+            seconds=min(self._interval(key, now) for key in self._intervals)
+        )
+
+    def _due_endpoints(self, now: float) -> dict[str, Callable[[], Awaitable[Any]]]:
+        # Allow half a tick of slack so scheduling jitter does not push an
+        # endpoint back by a whole tick.
+        slack = self.update_interval.total_seconds() / 2
+        due = {}
+        for key, fetch in self._endpoints().items():
+            breaker = self._breakers.get(key)
+            if breaker is not None and not breaker.allows(now):
+                continue
+            last = self._last_fetched.get(key)
+            if last is None or now - last >= self._interval(key, now) - slack:
+                due[key] = fetch
+        return due
+
+    async def _async_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        # The client's scheduler bounds and orders the requests to the box.
+        start = time.monotonic()
         try:
-            devices = await self._client.async_get_hosts()
-            info = await self._client.async_get_device_info()
-            wan_info = await self._client.async_get_wan_info()
-            dsl_info = await self._client.async_get_dsl_info()
-
-            return {
-                "devices": devices,
-                "device_info": info,
-                "wan_info": wan_info,
-                "dsl_info": dsl_info,
-            }
-        except NoActiveSessionException as err:
-            await self._client.async_close()
-            raise UpdateFailed("Session expired; will re-authenticate") from err
-        except Exception as ex:
-            raise UpdateFailed(str(ex)) from ex
+            return await fetch()
+        finally:
+            self.endpoint_durations[key] = time.monotonic() - start
+
+    def breaker_states(self, now: float | None = None) -> dict[str, dict[str, Any]]:
+        """Circuit breaker state of every endpoint that failed lately."""
+        now = time.monotonic() if now is None else now
+        return {key: breaker.as_dict(now) for key, breaker in self._breakers.items()}
+
+    async def _async_fetch_all(
+        self, endpoints: Mapping[str, Callable[[], Awaitable[Any]]]
+    ) -> dict[str, Any]:
+        """Fetch the endpoints concurrently within the refresh budget.
+
+        Returns the result, or the exception, of every endpoint; those still
+        running when the budget is spent are cancelled and get a TimeoutError.
+        """
+        if not endpoints:
+            return {}
+        tasks = {
+            key: asyncio.create_task(self._async_fetch(key, fetch))
+            for key, fetch in endpoints.items()
+        }
+        try:
+            _, pending = await asyncio.wait(
+                tasks.values(), timeout=REFRESH_BUDGET_SECONDS
+            )
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        results: dict[str, Any] = {}
+        for key, task in tasks.items():
+            if task in pending:
+                results[key] = TimeoutError(
+                    f"{key}: refresh budget of {REFRESH_BUDGET_SECONDS} s exceeded"
+                )
+            elif task.cancelled():
+                raise asyncio.CancelledError
+            else:
+                results[key] = task.exception() or task.result()
+        return results
+
+    def _record_outcomes(
+        self,
+        now: float,
+        fetched: set[str],
+        errors: Mapping[str, BaseException],
+        box_failed: bool,
+    ) -> None:
+        """Update the circuit breakers after a refresh.
+
+        When the box itself failed, which the backoff deals with, only
+        endpoints the box reports as missing count.
+        """
+        for key in fetched:
+            if (breaker := self._breakers.pop(key, None)) is not None and (
+                breaker.is_open
+            ):
+                _LOGGER.info("Fetching %s works again", key)
+        for key, err in errors.items():
+            permanent = isinstance(err, EndpointNotFoundException)
+            if isinstance(err, NoActiveSessionException) or (
+                box_failed and not permanent
+            ):
+                continue
+            breaker = self._breakers.setdefault(key, CircuitBreaker())
+            if (cooldown := breaker.record_failure(now, permanent)) is not None:
+                _LOGGER.warning(
+                    "Not fetching %s for %d s after %d failures, last: %s",
+                    key,
+                    cooldown,
+                    breaker.failures,
+                    err,
+                )
+
+    async def _async_update_data(self) -> dict:
+        self._updated_topics = None
+        start = time.monotonic()
+        endpoints = self._due_endpoints(start)
+
+        results = await self._async_fetch_all(endpoints)
+        self.refresh_duration = time.monotonic() - start
+
+        previous = self.data or dict.fromkeys(self._endpoints())
+        data: dict[str, Any] = dict(previous)
+        errors: dict[str, BaseException] = {}
+        for key, result in results.items():
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                errors[key] = result
+            else:
+                data[key] = result
+                self._last_fetched[key] = start
+
+        # Endpoints are polled on their own intervals, so a tick often fetches
+        # a single one; that one failing leaves the rest of the data fresh.
+        # The refresh only fails when the box itself does: it cannot be
+        # reached, rejects the session, or fails every one of several
+        # endpoints.
+        box_failed = bool(endpoints) and len(errors) == len(endpoints)
+        if box_failed and len(endpoints) == 1:
+            box_failed = isinstance(
+                next(iter(errors.values())),
+                (CannotConnectException, NoActiveSessionException),
+            )
+        self._record_outcomes(
+            start, endpoints.keys() - errors.keys(), errors, box_failed
+        )
+
+        _LOGGER.debug(
+            "Refresh took %.3f s (%s)",
+            self.refresh_duration,
+            ", ".join(
+                f"{key}={self.endpoint_durations.get(key, 0):.3f} s"
+                for key in endpoints
+            ),
+        )
+
+        if box_failed:
+            self._adapt_intervals(start, failed=True)
+            err = next(iter(errors.values()))
+            if any(isinstance(e, NoActiveSessionException) for e in errors.values()):
+                await self._client.async_close()
+                raise UpdateFailed("Session expired; will re-authenticate") from err
+            raise UpdateFailed(str(err)) from err
+
+        for key, err in errors.items():
+            _LOGGER.debug("Failed to fetch %s, keeping previous data: %s", key, err)
+
+        # Only endpoints whose payload actually changed are announced; the host
+        # table is announced per MAC so only the affected trackers write state.
+        topics = set()
+        for key in endpoints.keys() - errors.keys():
+            if key == "devices":
+                self.host_delta = diff_hosts(previous["devices"], data["devices"])
+                topics |= self.host_delta.topics()
+                if self._last_host_change is None or self.host_delta:
+                    self._last_host_change = start
+                # Hosts joining or leaving tend to come in bursts; the initial
+                # load is not one.
+                if self.host_delta and previous["devices"] is not None:
+                    self._accelerate_until = start + ACCELERATION_SECONDS
+            elif key == "host_traffic":
+                changed = self.host_traffic_rates.update(start, data[key])
+                topics.update(host_traffic_topic(mac) for mac in changed)
+            elif data[key] != previous[key]:
+                topics.add(key)
+
+        # Rates change even when the counters do not, so they have a topic of
+        # their own.
+        if "dsl_info" in endpoints and "dsl_info" not in errors:
+            rates = (self._wan_rx_rate.rate, self._wan_tx_rate.rate)
+            wan_rx, wan_tx = dsl_counters(data)
+            self._wan_rx_rate.add(start, wan_rx)
+            self._wan_tx_rate.add(start, wan_tx)
+            if rates != (self._wan_rx_rate.rate, self._wan_tx_rate.rate):
+                topics.add("wan_rate")
+
+        self._adapt_intervals(start, failed=False)
+
+        if topics:
+            self.summary = self._build_summary(data)
+            if self._snapshot_store is not None:
+                self._snapshot_store.async_delay_save(
+                    self._snapshot, SNAPSHOT_SAVE_DELAY_SECONDS
+                )
+
+        # After a failed refresh every entity has to re-evaluate its
+        # availability, and after the first live refresh its stale flag, so
+        # only narrow notifications while healthy.
+        if self.stale:
+            self.stale = False
+        elif self.last_update_success:
+            self._updated_topics = frozenset(topics)
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        updated = self._updated_topics
+        self._updated_topics = None
+        for update_callback, context in list(self._listeners.values()):
+            if updated is None or context is None or not updated.isdisjoint(context):
+                update_callback()
+
+    @callback
+    def async_apply_host_events(self, events: list[HostEvent]) -> bool:
+        """Apply pushed host changes to the current host table.
+
+        Returns False if an event referred to a host that is not known yet and
+        did not describe it fully, in which case the caller should request a
+        reconcile.
+        """
+        if not self.data or self.data.get("devices") is None:
+            return False
+
+        hosts = dict(self.data["devices"])
+        complete = True
+        for event in events:
+            current = hosts.get(event.mac)
+            if event.reason == "del":
+                hosts.pop(event.mac, None)
+            elif current is not None:
+                hosts[event.mac] = apply_host_attributes(current, event.attributes)
+            elif (
+                event.reason == "add"
+                and "DeviceType" in event.attributes
+                and (host := parse_host({"PhysAddress": event.mac, **event.attributes}))
+            ):
+                hosts[host.mac] = host
+            else:
+                complete = False
+
+        delta = diff_hosts(self.data["devices"], hosts)
+        if delta:
+            self._last_host_change = time.monotonic()
+            self.host_delta = delta
+            self.data = {**self.data, "devices": hosts}
+            self.summary = self._build_summary(self.data)
+            self._updated_topics = frozenset(delta.topics())
+            self.async_update_listeners()
+        return complete
+
+    @callback
+    def async_request_hosts_reconcile(self) -> None:
+        """Fetch the full host table on the next (debounced) refresh."""
+        self._last_fetched.pop("devices", None)
+        self.hass.async_create_task(self.async_request_refresh())
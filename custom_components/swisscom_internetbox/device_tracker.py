@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import dataclasses
+import datetime as dt
+import heapq
+import math
+from collections.abc import Callable
+
 from homeassistant.components.device_tracker import ScannerEntity, SourceType
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_at
 
 from .api import HostEntry
-from .const import DEVICE_ICONS, DOMAIN
+from .const import CONF_CONSIDER_HOME, DEFAULT_CONSIDER_HOME, DEVICE_ICONS, DOMAIN
 from .coordinator import InternetBoxDataCoordinator
 from .entity import InternetBoxDeviceEntity
 
@@ -17,6 +24,11 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     coordinator: InternetBoxDataCoordinator = hass.data[DOMAIN][entry.entry_id]
+    departures = DepartureTimer(
+        hass,
+        entry.options.get(CONF_CONSIDER_HOME, DEFAULT_CONSIDER_HOME.total_seconds()),
+    )
+    entry.async_on_unload(departures.async_stop)
 
     tracked = set()
 
@@ -29,37 +41,151 @@ async def async_setup_entry(
             return
 
         new_entities = []
-        for dev in coordinator.data.get("devices", []):
-            if not dev.mac or dev.mac in tracked:
+        for mac, dev in coordinator.hosts.items():
+            if mac in tracked:
                 continue
 
-            new_entities.append(InternetBoxDeviceTracker(coordinator, entry, dev))
-            tracked.add(dev.mac)
+            new_entities.append(
+                InternetBoxDeviceTracker(coordinator, entry, dev, departures)
+            )
+            tracked.add(mac)
 
         async_add_entities(new_entities)
 
-    entry.async_on_unload(coordinator.async_add_listener(new_device_callback))
+    entry.async_on_unload(
+        coordinator.async_add_listener(new_device_callback, frozenset({"devices"}))
+    )
     new_device_callback()
 
 
+class DepartureTimer:
+    """Pending departures of all trackers of an entry, on a single loop timer.
+
+    Deadlines are rounded up to whole seconds of loop time, so hosts leaving
+    together depart in one wakeup, and kept in one heap of which only the
+    earliest entry has a timer armed. Cancelled deadlines stay in the heap and
+    are skipped when they come up.
+    """
+
+    def __init__(self, hass: HomeAssistant, consider_home: float):
+        self._hass = hass
+        self.consider_home = consider_home
+        self._heap: list[tuple[float, str]] = []
+        self._pending: dict[str, tuple[float, Callable[[], None]]] = {}
+        self._armed_at: float | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._pending
+
+    @callback
+    def async_schedule(self, key: str, action: Callable[[], None]) -> None:
+        """Call ``action`` once the consider_home window has passed."""
+        deadline = math.ceil(self._hass.loop.time() + self.consider_home)
+        self._pending[key] = (deadline, action)
+        heapq.heappush(self._heap, (deadline, key))
+        if len(self._heap) > 2 * len(self._pending) + 64:
+            self._heap = [
+                (deadline, key) for key, (deadline, _) in self._pending.items()
+            ]
+            heapq.heapify(self._heap)
+        self._async_arm()
+
+    @callback
+    def async_cancel(self, key: str) -> None:
+        self._pending.pop(key, None)
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._armed_at = None
+        self._heap.clear()
+        self._pending.clear()
+
+    def _is_current(self, deadline: float, key: str) -> bool:
+        pending = self._pending.get(key)
+        return pending is not None and pending[0] == deadline
+
+    @callback
+    def _async_arm(self) -> None:
+        while self._heap and not self._is_current(*self._heap[0]):
+            heapq.heappop(self._heap)
+        deadline = self._heap[0][0] if self._heap else None
+        if deadline == self._armed_at:
+            return
+
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._armed_at = deadline
+        if deadline is not None:
+            self._unsub = async_call_at(self._hass, self._async_fire, deadline)
+
+    @callback
+    def _async_fire(self, _now: dt.datetime) -> None:
+        # The loop only runs this at or after the armed deadline.
+        now = max(self._armed_at or 0, self._hass.loop.time())
+        self._unsub = None
+        self._armed_at = None
+        while self._heap and self._heap[0][0] <= now:
+            deadline, key = heapq.heappop(self._heap)
+            if self._is_current(deadline, key):
+                _, action = self._pending.pop(key)
+                action()
+        self._async_arm()
+
+
 class InternetBoxDeviceTracker(InternetBoxDeviceEntity, ScannerEntity):
     def __init__(
         self,
         coordinator: InternetBoxDataCoordinator,
         entry: ConfigEntry,
         device: HostEntry,
+        departures: DepartureTimer,
     ):
         super().__init__(coordinator, entry, device)
         self._attr_name = self._device_name
-        self._attr_icon = DEVICE_ICONS.get(device.type.lower(), "mdi:help-network")
+        self._attr_icon = DEVICE_ICONS.get(
+            (device.type or "").lower(), "mdi:help-network"
+        )
+        self._departures = departures
+        self._connected = bool(device.active)
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        self._departures.async_cancel(self._mac)
 
     @callback
     def async_update_device(self):
-        self._device = self._find()
+        device = self.coordinator.get_host(self._mac)
+        if device is None:
+            # The box forgot the host; keep the last known details but report
+            # it as away.
+            device = dataclasses.replace(self._device, active=False)
+        self._device = device
+
+        # A host that drops off stays home for the consider_home window, so
+        # phones dozing on Wi-Fi do not flap between home and away.
+        if device.active:
+            self._departures.async_cancel(self._mac)
+            self._connected = True
+        elif not self._connected or self._departures.is_pending(self._mac):
+            return
+        elif self._departures.consider_home > 0:
+            self._departures.async_schedule(self._mac, self._async_depart)
+        else:
+            self._connected = False
+
+    @callback
+    def _async_depart(self) -> None:
+        self._connected = False
+        self.async_write_ha_state()
 
     @property
     def is_connected(self) -> bool:
-        return self._device.active
+        return self._connected
 
     @property
     def source_type(self):
@@ -76,9 +202,3 @@ class InternetBoxDeviceTracker(InternetBoxDeviceEntity, ScannerEntity):
     @property
     def hostname(self) -> str | None:
         return self._device.hostname
-
-    def _find(self) -> HostEntry | None:
-        for d in self.coordinator.data.get("devices") or []:
-            if (d.mac or "").lower() == self._mac.lower():
-                return d
-        return None
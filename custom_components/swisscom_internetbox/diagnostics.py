@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, DOMAIN
+from .coordinator import InternetBoxDataCoordinator
+
+# Identifiers of the box; the WAN and DSL payloads only hold link states and
+# byte counters.
+TO_REDACT = {CONF_PASSWORD, "external_ip", "serial_number", "mac_address"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return request statistics and refresh state for a config entry."""
+    coordinator: InternetBoxDataCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "refresh_duration": coordinator.refresh_duration,
+            "endpoint_durations": coordinator.endpoint_durations,
+            "breakers": coordinator.breaker_states(),
+            "summary": async_redact_data(asdict(coordinator.summary), TO_REDACT),
+            "payloads": {
+                key: async_redact_data(asdict(value), TO_REDACT)
+                for key in ("device_info", "wan_info", "dsl_info")
+                if (value := (coordinator.data or {}).get(key)) is not None
+            },
+        },
+        "client": coordinator.client.metrics.as_dict(),
+    }
@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
@@ -7,7 +8,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .api import HostEntry
 from .const import DOMAIN
-from .coordinator import InternetBoxDataCoordinator
+from .coordinator import InternetBoxDataCoordinator, host_topic
 
 
 class InternetBoxDeviceEntity(CoordinatorEntity[InternetBoxDataCoordinator]):
@@ -18,8 +19,11 @@ class InternetBoxDeviceEntity(CoordinatorEntity[InternetBoxDataCoordinator]):
         coordinator: InternetBoxDataCoordinator,
         entry: ConfigEntry,
         device: HostEntry,
+        topic: str | None = None,
     ):
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=frozenset({topic or host_topic(device.mac)})
+        )
 
         self._device = device
         self._attr_unique_id = device.mac
@@ -40,6 +44,10 @@ class InternetBoxDeviceEntity(CoordinatorEntity[InternetBoxDataCoordinator]):
         self.async_update_device()
         super()._handle_coordinator_update()
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        return {"stale": True} if self.coordinator.stale else None
+
     @property
     def _device_name(self):
         name = self._device.hostname
@@ -0,0 +1,17 @@
+"""Errors raised by the InternetBox client."""
+
+
+class SwisscomInetboxException(Exception):
+    """A request to the InternetBox failed."""
+
+
+class CannotConnectException(SwisscomInetboxException):
+    """The InternetBox could not be reached at all."""
+
+
+class NoActiveSessionException(SwisscomInetboxException):
+    """The InternetBox rejected the session, or none was opened yet."""
+
+
+class EndpointNotFoundException(SwisscomInetboxException):
+    """The InternetBox does not have the requested endpoint or object."""
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .api import InternetBoxClient
+from .errors import SwisscomInetboxException
+
+if TYPE_CHECKING:
+    from .coordinator import InternetBoxDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_SUBSCRIPTIONS = ["Devices.Device", "NeMo.Intf"]
+
+DEVICE_PREFIX = "Devices.Device."
+INTERFACE_PREFIX = "NeMo.Intf."
+
+REASON_ADD = "add"
+REASON_DEL = "del"
+REASON_CHANGED = "changed"
+_REASONS = {
+    "add": REASON_ADD,
+    "device_added": REASON_ADD,
+    "del": REASON_DEL,
+    "device_deleted": REASON_DEL,
+    "changed": REASON_CHANGED,
+    "device_updated": REASON_CHANGED,
+}
+
+# Interface attributes whose change can move hosts on or off the network.
+INTERFACE_LINK_ATTRIBUTES = {"Status", "Enable", "LinkState"}
+
+RETRY_MIN_SECONDS = 5
+RETRY_MAX_SECONDS = 300
+
+
+@dataclass
+class HostEvent:
+    reason: str
+    mac: str
+    attributes: dict[str, Any]
+
+
+def parse_host_event(data: dict[str, Any]) -> HostEvent | None:
+    """Translate a ``Devices.Device`` event into a HostEvent."""
+    handler = data.get("handler") or ""
+    if not handler.startswith(DEVICE_PREFIX):
+        return None
+
+    obj = data.get("object") or {}
+    reason = _REASONS.get(obj.get("reason"))
+    if reason is None:
+        return None
+
+    # Changed attributes come either as plain values or as {"from", "to"} pairs.
+    attributes = {
+        key: value["to"] if isinstance(value, dict) and "to" in value else value
+        for key, value in (obj.get("attributes") or {}).items()
+    }
+    key = handler[len(DEVICE_PREFIX) :].split(".", 1)[0]
+    mac = (attributes.get("PhysAddress") or key).lower()
+    return HostEvent(reason=reason, mac=mac, attributes=attributes)
+
+
+def is_link_event(data: dict[str, Any]) -> bool:
+    """Return True for interface events that can change host presence."""
+    if not (data.get("handler") or "").startswith(INTERFACE_PREFIX):
+        return False
+    attributes = (data.get("object") or {}).get("attributes") or {}
+    return not INTERFACE_LINK_ATTRIBUTES.isdisjoint(attributes)
+
+
+class InternetBoxEventListener:
+    """Apply host changes pushed over the sysbus event channel.
+
+    The coordinator keeps polling the full host table on a slow reconcile
+    interval, so a dropped channel or missed event is eventually corrected.
+    """
+
+    def __init__(
+        self, client: InternetBoxClient, coordinator: InternetBoxDataCoordinator
+    ):
+        self._client = client
+        self._coordinator = coordinator
+
+    async def async_run(self) -> None:
+        channel_id = 0
+        retry = RETRY_MIN_SECONDS
+        while True:
+            try:
+                channel_id, events = await self._client.async_get_events(
+                    EVENT_SUBSCRIPTIONS, channel_id
+                )
+                self._handle_events(events)
+            except SwisscomInetboxException as err:
+                _LOGGER.debug("Event channel failed, retrying in %s s: %s", retry, err)
+            except Exception:
+                # Without the listener, presence falls back to the slow
+                # reconcile interval, so it must not end.
+                _LOGGER.exception("Unexpected error on the event channel")
+            else:
+                retry = RETRY_MIN_SECONDS
+                continue
+
+            channel_id = 0
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, RETRY_MAX_SECONDS)
+
+    def _handle_events(self, events: list[dict[str, Any]]) -> None:
+        host_events = []
+        reconcile = False
+        for data in events:
+            try:
+                event = parse_host_event(data)
+                link = event is None and is_link_event(data)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring malformed event: %r", data)
+                continue
+            if event is not None:
+                host_events.append(event)
+            elif link:
+                reconcile = True
+
+        if host_events and not self._coordinator.async_apply_host_events(host_events):
+            reconcile = True
+        if reconcile:
+            self._coordinator.async_request_hosts_reconcile()
@@ -0,0 +1,141 @@
+"""Incremental decoding of the array in a sysbus ``status`` response.
+
+``Devices:get`` answers with one large array of host objects, each carrying
+far more fields than the integration reads. Rather than decoding the whole
+body into one tree, ``StatusArrayParser`` is fed the body chunk by chunk,
+decodes each element of the ``status`` array as soon as it is complete and
+hands it to a callback, which keeps only the fields it needs. Only the
+current element and the small envelope around the array are ever held.
+
+Elements are decoded in place by the C scanner behind ``json.JSONDecoder``;
+only the envelope is walked character by character.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.util.json import json_loads
+
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_STATUS_KEY = re.compile(r'"status"\s*:\s*$')
+_SEPARATOR = re.compile(r"[\s,]*")
+
+_decoder = json.JSONDecoder()
+
+
+def _string_end(text: str, start: int) -> int:
+    """Index after the quote closing a string whose body starts at ``start``.
+
+    Returns -1 if the string is not complete yet.
+    """
+    pos = start
+    while (pos := text.find('"', pos)) >= 0:
+        backslashes = 0
+        while text[pos - 1 - backslashes] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return pos + 1
+        pos += 1
+    return -1
+
+
+class StatusArrayParser:
+    """Feed a response body in chunks; elements of ``status`` go to a callback.
+
+    ``close()`` returns the rest of the response with ``status`` emptied, so
+    error payloads can still be checked as usual. If ``status`` is not an
+    array, nothing is cut out and the whole (small) response is returned.
+    """
+
+    def __init__(self, on_item: Callable[[Any], None]) -> None:
+        self._on_item = on_item
+        self.reset()
+
+    def reset(self) -> None:
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._envelope: list[str] = []
+        # Scan position in the text kept from the previous chunks.
+        self._pos = 0
+        self._depth = 0
+        self._in_status = False
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        text = self._text + self._utf8.decode(chunk)
+        pos = self._pos
+        # Start of the text not yet copied to the envelope.
+        consumed = 0
+
+        while True:
+            if self._in_status:
+                # The pattern also matches the empty string.
+                separator = _SEPARATOR.match(text, pos)
+                assert separator is not None
+                pos = separator.end()
+                if pos == len(text):
+                    consumed = pos
+                    break
+                if text[pos] == "]":
+                    self._in_status = False
+                    self._envelope.append("[]")
+                    pos = consumed = pos + 1
+                    continue
+                try:
+                    item, end = _decoder.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    # Most likely cut off by the end of the chunk.
+                    consumed = pos
+                    break
+                if end == len(text) and text[pos] not in '{["':
+                    # A number or literal may continue in the next chunk.
+                    consumed = pos
+                    break
+                self._on_item(item)
+                pos = consumed = end
+                continue
+
+            if (match := _STRUCTURE.search(text, pos)) is None:
+                pos = len(text)
+                break
+            index = match.start()
+            char = text[index]
+            if char == '"':
+                end = _string_end(text, index + 1)
+                if end < 0:
+                    pos = index
+                    break
+                pos = end
+            elif char in "{[":
+                pos = index + 1
+                if self._depth == 1 and char == "[":
+                    self._envelope.append(text[consumed:index])
+                    consumed = pos
+                    if _STATUS_KEY.search("".join(self._envelope)):
+                        self._in_status = True
+                        continue
+                    self._envelope.append(char)
+                self._depth += 1
+            else:
+                pos = index + 1
+                self._depth -= 1
+
+        if not self._in_status:
+            self._envelope.append(text[consumed:pos])
+            consumed = pos
+        self._text = text[consumed:]
+        self._pos = pos - consumed
+
+    def close(self) -> Any:
+        """Return the decoded response without the items of ``status``."""
+        rest = self._text + self._utf8.decode(b"", final=True)
+        if self._in_status:
+            raise json.JSONDecodeError("Unterminated status array", rest, 0)
+        envelope = "".join(self._envelope) + rest
+        return json_loads(envelope) if envelope.strip() else None
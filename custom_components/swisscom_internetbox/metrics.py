@@ -0,0 +1,88 @@
+"""Request statistics recorded by the client.
+
+Recording is a counter bump and a deque append per request; percentiles are
+only computed when a sensor or the diagnostics download reads them.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+# Number of recent requests per endpoint the latency percentiles are taken from.
+LATENCY_WINDOW = 128
+
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    requests: int = 0
+    errors: int = 0
+    # Calls answered by a request already in flight, or by a fresh result.
+    coalesced: int = 0
+    cached: int = 0
+    last_payload_bytes: int | None = None
+    max_payload_bytes: int = 0
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_WINDOW)
+    )
+
+    def record_request(self, duration: float, error: bool) -> None:
+        self.requests += 1
+        if error:
+            self.errors += 1
+        self.latencies.append(duration)
+
+    def record_payload(self, size: int) -> None:
+        self.last_payload_bytes = size
+        self.max_payload_bytes = max(self.max_payload_bytes, size)
+
+    def latency(self, quantile: float) -> float | None:
+        """Latency in seconds at ``quantile`` (0..1) over the recent window."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[round(quantile * (len(ordered) - 1))]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "coalesced": self.coalesced,
+            "cached": self.cached,
+            "latency_p50": self.latency(0.5),
+            "latency_p95": self.latency(0.95),
+            "latency_max": self.latency(1),
+            "last_payload_bytes": self.last_payload_bytes,
+            "max_payload_bytes": self.max_payload_bytes,
+        }
+
+
+class ClientMetrics:
+    """Per-endpoint request statistics plus session counters."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.logins = 0
+        self.relogins = 0
+        # Requests waiting for the scheduler, and how many ever had to wait.
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.queued = 0
+
+    def endpoint(self, path: str) -> EndpointMetrics:
+        if (metrics := self.endpoints.get(path)) is None:
+            metrics = self.endpoints[path] = EndpointMetrics()
+        return metrics
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "logins": self.logins,
+            "relogins": self.relogins,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "queued": self.queued,
+            "endpoints": {
+                path: metrics.as_dict() for path, metrics in self.endpoints.items()
+            },
+        }
@@ -0,0 +1,166 @@
+"""Throughput derived from the byte counters reported by the box."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+from collections.abc import Mapping
+
+# The DSL and Wi-Fi station counters are unsigned 32-bit values.
+COUNTER_WRAP = 2**32
+# Samples kept for smoothing; the rate spans the oldest to the newest one.
+RATE_SAMPLES = 3
+
+
+def counter_delta(previous: int, current: int) -> int | None:
+    """Bytes counted between two samples, or None if the counter was reset.
+
+    A counter that goes backwards either wrapped at 32 bits or was reset by a
+    reboot or resync. It is taken as a wrap only if the previous value was in
+    the upper half of the 32-bit range and the wrapped delta is plausible
+    (below half the range); a 64-bit counter going backwards was reset.
+    """
+    delta = current - previous
+    if delta >= 0:
+        return delta
+    wrapped = delta + COUNTER_WRAP
+    if not (
+        COUNTER_WRAP // 2 <= previous < COUNTER_WRAP
+        and 0 <= wrapped < COUNTER_WRAP // 2
+    ):
+        return None
+    return wrapped
+
+
+class ByteRate:
+    """Smoothed rate of a byte counter, in bit/s.
+
+    After a counter reset the history is dropped and the rate is unknown until
+    the next sample.
+    """
+
+    __slots__ = ("_last", "_samples", "_total")
+
+    def __init__(self, samples: int = RATE_SAMPLES) -> None:
+        # (timestamp, bytes counted since the first sample)
+        self._samples: deque[tuple[float, int]] = deque(maxlen=samples)
+        self._last: int | None = None
+        self._total = 0
+
+    def add(self, timestamp: float, counter: int | None) -> None:
+        if counter is None:
+            return
+        if self._last is None:
+            self._restart(timestamp, counter)
+            return
+
+        delta = counter_delta(self._last, counter)
+        if delta is None:
+            self._restart(timestamp, counter)
+            return
+
+        self._last = counter
+        self._total += delta
+        if self._samples and timestamp <= self._samples[-1][0]:
+            self._samples.pop()
+        self._samples.append((timestamp, self._total))
+
+    def _restart(self, timestamp: float, counter: int) -> None:
+        self._samples.clear()
+        self._samples.append((timestamp, 0))
+        self._last = counter
+        self._total = 0
+
+    @property
+    def rate(self) -> int | None:
+        if len(self._samples) < 2:
+            return None
+        (start, first), (end, last) = self._samples[0], self._samples[-1]
+        return round((last - first) * 8 / (end - start))
+
+
+class HostTrafficRates:
+    """Receive and transmit rates of every host, in bit/s.
+
+    Each MAC gets a slot while it is in the samples; counters and rates live
+    in flat arrays indexed by slot, so a batched sample of all hosts is turned
+    into rates in one pass instead of per entity. Hosts missing from a sample
+    lose their slot, so randomized Wi-Fi MACs do not pile up, and read as
+    unknown, as do hosts whose counter was reset.
+    """
+
+    __slots__ = ("_index", "_rates", "_samples", "_timestamp")
+
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {}
+        # Interleaved per slot: rx, tx. -1 marks a missing counter.
+        self._samples = array("q")
+        self._rates = array("d")
+        self._timestamp: float | None = None
+
+    def update(
+        self, timestamp: float, counters: Mapping[str, tuple[int, int]]
+    ) -> set[str]:
+        """Take a new sample; return the MACs whose rates changed."""
+        changed = set()
+        if gone := self._index.keys() - counters.keys():
+            changed = {mac for mac in gone if self.rates(mac) != (None, None)}
+            self._prune(gone)
+        for mac in counters:
+            if mac not in self._index:
+                self._index[mac] = len(self._index)
+                self._samples.extend((-1, -1))
+                self._rates.extend((math.nan, math.nan))
+
+        current = array("q", [-1]) * len(self._samples)
+        for mac, (rx, tx) in counters.items():
+            slot = 2 * self._index[mac]
+            current[slot] = rx
+            current[slot + 1] = tx
+
+        elapsed = None if self._timestamp is None else timestamp - self._timestamp
+        rates = array("d", [math.nan]) * len(current)
+        if elapsed:
+            for i, (previous, sample) in enumerate(
+                zip(self._samples, current, strict=True)
+            ):
+                if previous >= 0 and sample >= 0:
+                    delta = counter_delta(previous, sample)
+                    if delta is not None:
+                        rates[i] = delta * 8 / elapsed
+
+        changed |= {
+            mac
+            for mac, slot in self._index.items()
+            if _rounded(rates[2 * slot]) != _rounded(self._rates[2 * slot])
+            or _rounded(rates[2 * slot + 1]) != _rounded(self._rates[2 * slot + 1])
+        }
+        self._samples = current
+        self._rates = rates
+        self._timestamp = timestamp
+        return changed
+
+    def _prune(self, gone: set[str]) -> None:
+        """Drop the slots of ``gone``, moving the others up."""
+        index: dict[str, int] = {}
+        samples = array("q")
+        rates = array("d")
+        for mac, slot in self._index.items():
+            if mac not in gone:
+                index[mac] = len(index)
+                samples.extend(self._samples[2 * slot : 2 * slot + 2])
+                rates.extend(self._rates[2 * slot : 2 * slot + 2])
+        self._index = index
+        self._samples = samples
+        self._rates = rates
+
+    def rates(self, mac: str) -> tuple[int | None, int | None]:
+        if (slot := self._index.get(mac)) is None:
+            return None, None
+        rx, tx = self._rates[2 * slot], self._rates[2 * slot + 1]
+        return _rounded(rx), _rounded(tx)
+
+
+def _rounded(rate: float) -> int | None:
+    return None if math.isnan(rate) else round(rate)
@@ -0,0 +1,133 @@
+"""Admission of requests to one InternetBox.
+
+The box's web server handles requests one after the other on a weak CPU, so
+piling up concurrent calls only makes all of them slower and can make it
+drop sessions. Every request of a client goes through its scheduler, which
+bounds the requests in flight and, when they queue up, lets host presence go
+before status and diagnostics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+from .const import DEFAULT_REQUEST_TIMEOUT_SECONDS
+from .metrics import ClientMetrics
+
+
+class Priority(IntEnum):
+    """Request classes, served in this order when requests queue up."""
+
+    PRESENCE = 0
+    STATUS = 1
+    DIAGNOSTICS = 2
+
+
+# Seconds a request may take, waiting in the queue included. Presence is only
+# useful while fresh; diagnostics may wait behind it.
+PRIORITY_TIMEOUTS = {
+    Priority.PRESENCE: DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    Priority.STATUS: DEFAULT_REQUEST_TIMEOUT_SECONDS * 2,
+    Priority.DIAGNOSTICS: DEFAULT_REQUEST_TIMEOUT_SECONDS * 3,
+}
+
+
+class RequestScheduler:
+    """Bound the requests in flight, serving queued ones by priority.
+
+    With room for more than one request, one slot is kept free of anything
+    but presence requests, so slow diagnostics can never hold up the host
+    table.
+    """
+
+    def __init__(self, max_concurrency: int, metrics: ClientMetrics) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._metrics = metrics
+        self._active = 0
+        # Requests in flight that are not presence requests.
+        self._active_background = 0
+        self._queue: list[tuple[Priority, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @max_concurrency.setter
+    def max_concurrency(self, value: int) -> None:
+        self._max_concurrency = max(1, value)
+        self._dispatch()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(not waiter.done() for _, _, waiter in self._queue)
+
+    def _background_limit(self) -> int:
+        return max(1, self._max_concurrency - 1)
+
+    def _can_start(self, priority: Priority) -> bool:
+        if self._active >= self._max_concurrency:
+            return False
+        return (
+            priority is Priority.PRESENCE
+            or self._active_background < self._background_limit()
+        )
+
+    def _start(self, priority: Priority) -> None:
+        self._active += 1
+        if priority is not Priority.PRESENCE:
+            self._active_background += 1
+
+    def _dispatch(self) -> None:
+        """Start queued requests while there is room, best priority first."""
+        queue = self._queue
+        while queue:
+            priority, _, waiter = queue[0]
+            if waiter.done():
+                # Cancelled while queued.
+                heapq.heappop(queue)
+                continue
+            if not self._can_start(priority):
+                # Everything behind the head has the same or a lower priority.
+                break
+            heapq.heappop(queue)
+            self._start(priority)
+            waiter.set_result(None)
+        self._metrics.queue_depth = self.queue_depth
+
+    @asynccontextmanager
+    async def async_slot(self, priority: Priority) -> AsyncIterator[None]:
+        """Wait for room to send a request of ``priority``, then hold it."""
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self._dispatch()
+        if not waiter.done():
+            self._metrics.queued += 1
+            self._metrics.max_queue_depth = max(
+                self._metrics.max_queue_depth, self._metrics.queue_depth
+            )
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Given a slot just as it was cancelled; pass it on.
+                    self._release(priority)
+                else:
+                    self._dispatch()
+                raise
+
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _release(self, priority: Priority) -> None:
+        self._active -= 1
+        if priority is not Priority.PRESENCE:
+            self._active_background -= 1
+        self._dispatch()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -9,47 +11,89 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfDataRate,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .api import (
+    PATH_DEVICE_INFO,
+    PATH_DEVICES,
+    PATH_DSL_STATS,
+    PATH_WAN_STATUS,
+    BoxInfo,
+    HostEntry,
+)
 from .const import DOMAIN
-from .coordinator import InternetBoxDataCoordinator
+from .coordinator import (
+    InternetBoxDataCoordinator,
+    InternetBoxSummary,
+    host_traffic_topic,
+)
+from .entity import InternetBoxDeviceEntity
+from .metrics import EndpointMetrics
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, kw_only=True)
 class InternetBoxSensorDescription(SensorEntityDescription):
     key: str
+    value_fn: Callable[[InternetBoxSummary], StateType]
+    endpoint: str = "devices"
+
+
+@dataclass(frozen=True, kw_only=True)
+class InternetBoxMetricSensorDescription(SensorEntityDescription):
+    key: str
+    value_fn: Callable[[InternetBoxDataCoordinator], StateType]
+    attributes_fn: Callable[[InternetBoxDataCoordinator], dict[str, Any] | None] = (
+        lambda coordinator: None
+    )
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
 
 
 SENSORS: tuple[InternetBoxSensorDescription, ...] = (
     InternetBoxSensorDescription(
         key="connected_devices",
+        value_fn=lambda summary: summary.connected_devices,
         name="Connected devices",
         icon="mdi:lan-connect",
         state_class=SensorStateClass.MEASUREMENT,
     ),
     InternetBoxSensorDescription(
         key="online_devices",
+        value_fn=lambda summary: summary.online_devices or None,
         name="Online devices",
         icon="mdi:lan-check",
         state_class=SensorStateClass.MEASUREMENT,
     ),
     InternetBoxSensorDescription(
         key="sw_version",
+        value_fn=lambda summary: summary.sw_version,
+        endpoint="device_info",
         name="Software version",
         icon="mdi:router-wireless",
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
     InternetBoxSensorDescription(
         key="model",
+        value_fn=lambda summary: summary.model,
+        endpoint="device_info",
         name="Model",
         icon="mdi:router",
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
     InternetBoxSensorDescription(
         key="uptime",
+        value_fn=lambda summary: summary.uptime,
+        endpoint="device_info",
         name="Uptime",
         icon="mdi:clock-time-four",
         native_unit_of_measurement="s",
@@ -58,29 +102,67 @@ SENSORS: tuple[InternetBoxSensorDescription, ...] = (
     ),
     InternetBoxSensorDescription(
         key="external_ip",
+        value_fn=lambda summary: summary.external_ip,
+        endpoint="wan_info",
         name="External IP",
         icon="mdi:ip-network",
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
     InternetBoxSensorDescription(
         key="wan_rx",
+        value_fn=lambda summary: summary.wan_rx,
+        endpoint="dsl_info",
         name="WAN received",
         icon="mdi:download",
-        unit_of_measurement="B",
-        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
         entity_registry_enabled_default=False,
     ),
     InternetBoxSensorDescription(
         key="wan_tx",
+        value_fn=lambda summary: summary.wan_tx,
+        endpoint="dsl_info",
         name="WAN sent",
         icon="mdi:upload",
-        unit_of_measurement="B",
-        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
         entity_registry_enabled_default=False,
     ),
-    InternetBoxSensorDescription(key="link_state", name="Link state", icon="mdi:link"),
+    InternetBoxSensorDescription(
+        key="wan_download_rate",
+        value_fn=lambda summary: summary.wan_rx_rate,
+        endpoint="wan_rate",
+        name="WAN download rate",
+        icon="mdi:download-network",
+        native_unit_of_measurement=UnitOfDataRate.BITS_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    InternetBoxSensorDescription(
+        key="wan_upload_rate",
+        value_fn=lambda summary: summary.wan_tx_rate,
+        endpoint="wan_rate",
+        name="WAN upload rate",
+        icon="mdi:upload-network",
+        native_unit_of_measurement=UnitOfDataRate.BITS_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    InternetBoxSensorDescription(
+        key="link_state",
+        value_fn=lambda summary: summary.link_state,
+        endpoint="wan_info",
+        name="Link state",
+        icon="mdi:link",
+    ),
     InternetBoxSensorDescription(
         key="link_type",
+        value_fn=lambda summary: summary.link_type,
+        endpoint="wan_info",
         name="Link type",
         icon="mdi:link",
         entity_category=EntityCategory.DIAGNOSTIC,
@@ -88,6 +170,104 @@ SENSORS: tuple[InternetBoxSensorDescription, ...] = (
 )
 
 
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else seconds * 1000
+
+
+def _endpoint_attributes(metrics: EndpointMetrics) -> dict[str, Any]:
+    return {
+        "requests": metrics.requests,
+        "errors": metrics.errors,
+        "latency_p50_ms": _ms(metrics.latency(0.5)),
+        "latency_max_ms": _ms(metrics.latency(1)),
+        "last_payload_bytes": metrics.last_payload_bytes,
+        "max_payload_bytes": metrics.max_payload_bytes,
+    }
+
+
+def _latency_sensor(
+    key: str, name: str, path: str
+) -> InternetBoxMetricSensorDescription:
+    return InternetBoxMetricSensorDescription(
+        key=f"{key}_latency",
+        value_fn=lambda coordinator: _ms(
+            coordinator.client.metrics.endpoint(path).latency(0.95)
+        ),
+        attributes_fn=lambda coordinator: _endpoint_attributes(
+            coordinator.client.metrics.endpoint(path)
+        ),
+        name=f"{name} latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+    )
+
+
+# Disabled by default; the latency sensors report the p95 over recent requests
+# and carry the remaining endpoint statistics as attributes.
+METRIC_SENSORS: tuple[InternetBoxMetricSensorDescription, ...] = (
+    _latency_sensor("devices", "Hosts request", PATH_DEVICES),
+    _latency_sensor("device_info", "Device info request", PATH_DEVICE_INFO),
+    _latency_sensor("wan_info", "WAN status request", PATH_WAN_STATUS),
+    _latency_sensor("dsl_info", "DSL stats request", PATH_DSL_STATS),
+    InternetBoxMetricSensorDescription(
+        key="refresh_duration",
+        value_fn=lambda coordinator: _ms(coordinator.refresh_duration),
+        attributes_fn=lambda coordinator: {
+            key: _ms(duration)
+            for key, duration in coordinator.endpoint_durations.items()
+        },
+        name="Refresh duration",
+        icon="mdi:timer-sync-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+    ),
+    InternetBoxMetricSensorDescription(
+        key="relogins",
+        value_fn=lambda coordinator: coordinator.client.metrics.relogins,
+        attributes_fn=lambda coordinator: {"logins": coordinator.client.metrics.logins},
+        name="Re-logins",
+        icon="mdi:account-key",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class InternetBoxHostTrafficSensorDescription(SensorEntityDescription):
+    key: str
+    # Index into the (received, sent) rates of a host.
+    direction: int
+
+
+HOST_TRAFFIC_SENSORS: tuple[InternetBoxHostTrafficSensorDescription, ...] = (
+    InternetBoxHostTrafficSensorDescription(
+        key="download_rate",
+        direction=0,
+        name="Download rate",
+        icon="mdi:download-network",
+        native_unit_of_measurement=UnitOfDataRate.BITS_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    InternetBoxHostTrafficSensorDescription(
+        key="upload_rate",
+        direction=1,
+        name="Upload rate",
+        icon="mdi:upload-network",
+        native_unit_of_measurement=UnitOfDataRate.BITS_PER_SECOND,
+        suggested_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -95,9 +275,87 @@ async def async_setup_entry(
 ) -> None:
     coordinator: InternetBoxDataCoordinator = hass.data[DOMAIN][entry.entry_id]
     async_add_entities(
-        [InternetBoxSensor(coordinator, entry.entry_id, desc) for desc in SENSORS]
+        [
+            *(InternetBoxSensor(coordinator, entry, desc) for desc in SENSORS),
+            *(
+                InternetBoxMetricSensor(coordinator, entry, desc)
+                for desc in METRIC_SENSORS
+            ),
+        ]
     )
 
+    @callback
+    def update_router_device() -> None:
+        """Fill in model and firmware once the device information arrives."""
+        info: BoxInfo | None = (coordinator.data or {}).get("device_info")
+        device_registry = dr.async_get(hass)
+        device = device_registry.async_get_device(
+            identifiers={_router_identifier(entry)}
+        )
+        if info is None or device is None:
+            return
+        if (device.model, device.sw_version) != (
+            info.model_name or "InternetBox",
+            info.software_version,
+        ):
+            device_registry.async_update_device(
+                device.id,
+                model=info.model_name or "InternetBox",
+                sw_version=info.software_version,
+            )
+
+    entry.async_on_unload(
+        coordinator.async_add_listener(update_router_device, frozenset({"device_info"}))
+    )
+
+    if not coordinator.host_traffic:
+        return
+
+    tracked: set[str] = set()
+
+    @callback
+    def new_station_callback() -> None:
+        """Add traffic sensors for hosts the box reports counters for."""
+        traffic = (coordinator.data or {}).get("host_traffic") or {}
+        new_entities: list[InternetBoxHostTrafficSensor] = []
+        for mac in traffic.keys() - tracked:
+            if (host := coordinator.get_host(mac)) is None:
+                continue
+            new_entities.extend(
+                InternetBoxHostTrafficSensor(coordinator, entry, host, desc)
+                for desc in HOST_TRAFFIC_SENSORS
+            )
+            tracked.add(mac)
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(coordinator.async_add_listener(new_station_callback))
+    new_station_callback()
+
+
+def _router_identifier(entry: ConfigEntry) -> tuple[str, str]:
+    # The serial number stored by the config flow; known even while the device
+    # information of the box has not been fetched yet.
+    return DOMAIN, entry.unique_id or entry.entry_id
+
+
+def _router_device_info(
+    coordinator: InternetBoxDataCoordinator, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Create device info for the main router to group all sensors."""
+    data = coordinator.data or {}
+    device_info: BoxInfo = data.get("device_info") or BoxInfo()
+
+    return {
+        "identifiers": {_router_identifier(entry)},
+        "name": device_info.model_name or "Swisscom InternetBox",
+        "manufacturer": "Swisscom",
+        "model": device_info.model_name or "InternetBox",
+        "sw_version": device_info.software_version,
+        "configuration_url": f"http://{coordinator.client.host}",
+    }
+
 
 class InternetBoxSensor(CoordinatorEntity[InternetBoxDataCoordinator], SensorEntity):
     entity_description: InternetBoxSensorDescription
@@ -105,74 +363,76 @@ class InternetBoxSensor(CoordinatorEntity[InternetBoxDataCoordinator], SensorEnt
     def __init__(
         self,
         coordinator: InternetBoxDataCoordinator,
-        entry_id: str,
+        entry: ConfigEntry,
         description: InternetBoxSensorDescription,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset({description.endpoint}))
         self.entity_description = description
-        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
 
         # Group all sensors under the main router device
-        self._attr_device_info = self._get_device_info(entry_id)
+        self._attr_device_info = _router_device_info(coordinator, entry)
 
-    def _get_device_info(self, entry_id: str):
-        """Create device info for the main router to group all sensors."""
-        data = self.coordinator.data or {}
-        device_info = data.get("device_info") or {}
-
-        # Use the router's serial number or MAC as identifier if available
-        serial_number = device_info.get("SerialNumber")
-        mac_address = device_info.get("MACAddress")
-
-        # Create device identifier
-        device_identifier = serial_number or mac_address or entry_id
-
-        return {
-            "identifiers": {(DOMAIN, device_identifier)},
-            "name": device_info.get("ModelName", "Swisscom InternetBox"),
-            "manufacturer": "Swisscom",
-            "model": device_info.get("ModelName", "InternetBox"),
-            "sw_version": device_info.get("SoftwareVersion"),
-            "configuration_url": f"http://{self.coordinator._client.host}",
-        }
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        return {"stale": True} if self.coordinator.stale else None
 
     @property
-    def native_value(self):
-        data = self.coordinator.data or {}
-        devices = data.get("devices") or []
-        device_info = data.get("device_info") or {}
-        wan_info = data.get("wan_info") or {}
-        dsl_info = data.get("dsl_info") or {}
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator.summary)
 
-        if self.entity_description.key == "connected_devices":
-            return len(devices)
 
-        if self.entity_description.key == "online_devices":
-            actives = [d for d in devices if d.active]
-            return len(actives) if actives else None
+class InternetBoxMetricSensor(
+    CoordinatorEntity[InternetBoxDataCoordinator], SensorEntity
+):
+    """Request statistics of the integration itself, updated on every refresh."""
 
-        if self.entity_description.key == "sw_version":
-            return device_info.get("SoftwareVersion")
+    entity_description: InternetBoxMetricSensorDescription
 
-        if self.entity_description.key == "model":
-            return device_info.get("ModelName")
+    def __init__(
+        self,
+        coordinator: InternetBoxDataCoordinator,
+        entry: ConfigEntry,
+        description: InternetBoxMetricSensorDescription,
+    ):
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = _router_device_info(coordinator, entry)
 
-        if self.entity_description.key == "uptime":
-            return device_info.get("UpTime")
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        return self.entity_description.attributes_fn(self.coordinator)
 
-        if self.entity_description.key == "external_ip":
-            return device_info.get("ExternalIPAddress")
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator)
 
-        if self.entity_description.key == "wan_rx":
-            return dsl_info.get("status", {}).get("stats", {}).get("BytesReceived")
 
-        if self.entity_description.key == "wan_tx":
-            return dsl_info.get("status", {}).get("stats", {}).get("BytesSent")
+class InternetBoxHostTrafficSensor(InternetBoxDeviceEntity, SensorEntity):
+    """Traffic rate of a single host, attached to its tracker's device."""
 
-        if self.entity_description.key == "link_state":
-            return wan_info.get("data").get("LinkState")
+    entity_description: InternetBoxHostTrafficSensorDescription
 
-        if self.entity_description.key == "link_type":
-            return wan_info.get("data").get("LinkType")
+    def __init__(
+        self,
+        coordinator: InternetBoxDataCoordinator,
+        entry: ConfigEntry,
+        device: HostEntry,
+        description: InternetBoxHostTrafficSensorDescription,
+    ):
+        super().__init__(
+            coordinator, entry, device, topic=host_traffic_topic(device.mac)
+        )
+        self.entity_description = description
+        self._attr_unique_id = f"{device.mac}_{description.key}"
 
-        return None
+    @callback
+    def async_update_device(self) -> None:
+        if (device := self.coordinator.get_host(self._mac)) is not None:
+            self._device = device
+
+    @property
+    def native_value(self) -> StateType:
+        rates = self.coordinator.host_traffic_rates.rates(self._mac)
+        return rates[self.entity_description.direction]
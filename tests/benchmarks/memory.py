@@ -0,0 +1,27 @@
+"""tracemalloc helpers shared by the memory benchmarks."""
+
+from __future__ import annotations
+
+import tracemalloc
+from collections.abc import Callable
+
+
+def _traced(fn: Callable[[], object]) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def peak_allocation(fn: Callable[[], object]) -> int:
+    """Most bytes allocated at once while ``fn`` runs."""
+    return _traced(fn)[1]
+
+
+def retained_allocation(fn: Callable[[], object]) -> int:
+    """Bytes still allocated by what ``fn`` returns."""
+    return _traced(fn)[0]
@@ -0,0 +1,29 @@
+"""Cost of tracking consider_home departures for many hosts at once."""
+
+from __future__ import annotations
+
+import pytest
+from custom_components.swisscom_internetbox.device_tracker import DepartureTimer
+from homeassistant.core import HomeAssistant
+
+HOST_COUNT = 1000
+
+
+def _flap(timer: DepartureTimer, keys: list[str]) -> None:
+    # Every host leaves, half of them come back within the window.
+    for key in keys:
+        timer.async_schedule(key, lambda: None)
+    for key in keys[::2]:
+        timer.async_cancel(key)
+
+
+@pytest.mark.benchmark(group="departures")
+def test_schedule_and_cancel(benchmark, hass: HomeAssistant) -> None:
+    timer = DepartureTimer(hass, consider_home=180)
+    keys = [f"host-{i}" for i in range(HOST_COUNT)]
+
+    benchmark(_flap, timer, keys)
+
+    # One loop timer covers every pending departure.
+    assert timer._unsub is not None
+    timer.async_stop()
@@ -0,0 +1,183 @@
+"""End-to-end cost of the integration against the simulated InternetBox.
+
+Every benchmark runs at each host count in ``HOST_COUNTS`` (override with the
+``INTERNETBOX_BENCH_HOSTS`` environment variable, e.g. ``10,5000``). The tests
+are synchronous so pytest-benchmark can time them; async work is driven on
+the Home Assistant loop, which is idle while the test body runs.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+from collections.abc import Coroutine
+from typing import Any
+
+import pytest
+from custom_components.swisscom_internetbox.api import InternetBoxClient
+from custom_components.swisscom_internetbox.const import (
+    CONF_CONSIDER_HOME,
+    DOMAIN,
+    ENDPOINT_INTERVALS,
+)
+from custom_components.swisscom_internetbox.coordinator import (
+    InternetBoxDataCoordinator,
+)
+from custom_components.swisscom_internetbox.events import HostEvent
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_SSL, CONF_VERIFY_SSL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from swisscom_internetbox.simulator import PASSWORD, FakeInternetBox
+
+from .memory import peak_allocation
+
+HOST_COUNTS = [
+    int(count)
+    for count in os.environ.get("INTERNETBOX_BENCH_HOSTS", "10,100,1000").split(",")
+]
+
+
+def _run(hass: HomeAssistant, coro: Coroutine[Any, Any, Any]) -> Any:
+    return hass.loop.run_until_complete(coro)
+
+
+@pytest.fixture(name="box", params=HOST_COUNTS, ids=lambda count: f"{count}-hosts")
+async def box_fixture(request, socket_enabled):
+    box = FakeInternetBox()
+    box.add_hosts(request.param)
+    await box.start()
+    yield box
+    await box.close()
+
+
+@pytest.fixture(name="client")
+async def client_fixture(hass: HomeAssistant, box: FakeInternetBox):
+    client = InternetBoxClient(
+        hass, host=box.host, password=PASSWORD, ssl=False, verify_ssl=False
+    )
+    yield client
+    await client.async_close()
+
+
+@pytest.fixture(name="coordinator")
+def coordinator_fixture(
+    hass: HomeAssistant, client: InternetBoxClient
+) -> InternetBoxDataCoordinator:
+    # Every endpoint is due on every refresh.
+    return InternetBoxDataCoordinator(
+        hass, client, intervals=dict.fromkeys(ENDPOINT_INTERVALS, dt.timedelta(0))
+    )
+
+
+@pytest.fixture(name="entry")
+def entry_fixture(
+    hass: HomeAssistant, enable_custom_integrations, box: FakeInternetBox
+) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=box.device_info["SerialNumber"],
+        data={
+            CONF_HOST: box.host,
+            CONF_PASSWORD: PASSWORD,
+            CONF_SSL: False,
+            CONF_VERIFY_SSL: False,
+        },
+        # Hosts going offline flip to away right away instead of after a
+        # grace period.
+        options={CONF_CONSIDER_HOME: 0},
+    )
+    entry.add_to_hass(hass)
+
+    # Trackers are disabled by default; register them enabled so their state
+    # writes are part of the measurement.
+    entity_registry = er.async_get(hass)
+    for host in box.hosts:
+        entity_registry.async_get_or_create(
+            "device_tracker",
+            DOMAIN,
+            host["PhysAddress"].lower(),
+            config_entry=entry,
+        )
+    return entry
+
+
+@pytest.mark.benchmark(group="e2e-refresh")
+def test_refresh(benchmark, hass: HomeAssistant, coordinator) -> None:
+    _run(hass, coordinator.async_refresh())
+
+    benchmark(lambda: _run(hass, coordinator.async_refresh()))
+
+    assert coordinator.last_update_success
+
+
+@pytest.mark.benchmark(group="e2e-refresh")
+def test_refresh_with_failing_endpoint(
+    benchmark, hass: HomeAssistant, box: FakeInternetBox, coordinator
+) -> None:
+    _run(hass, coordinator.async_refresh())
+    box.errors["/sysbus/NeMo/Intf/dsl0:getDSLChannelStats"] = 500
+
+    benchmark(lambda: _run(hass, coordinator.async_refresh()))
+
+    assert coordinator.last_update_success
+    assert coordinator.data["dsl_info"] is not None
+
+
+@pytest.mark.benchmark(group="e2e-memory")
+def test_refresh_memory(
+    benchmark, hass: HomeAssistant, box: FakeInternetBox, coordinator
+) -> None:
+    _run(hass, coordinator.async_refresh())
+
+    # The peak includes the simulator encoding its response in-process.
+    peak = peak_allocation(lambda: _run(hass, coordinator.async_refresh()))
+    benchmark.extra_info["peak_bytes"] = peak
+    benchmark.extra_info["peak_bytes_per_host"] = peak // len(box.hosts)
+
+    benchmark.pedantic(lambda: _run(hass, coordinator.async_refresh()), rounds=3)
+
+
+@pytest.mark.benchmark(group="e2e-startup")
+def test_startup(benchmark, hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    def _unload() -> None:
+        if entry.state is ConfigEntryState.LOADED:
+            _run(hass, hass.config_entries.async_unload(entry.entry_id))
+            _run(hass, hass.async_block_till_done())
+
+    async def _setup() -> None:
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    benchmark.pedantic(lambda: _run(hass, _setup()), setup=_unload, rounds=3)
+
+    assert entry.state is ConfigEntryState.LOADED
+    _unload()
+
+
+@pytest.mark.benchmark(group="e2e-entity-update")
+def test_entity_update(
+    benchmark, hass: HomeAssistant, box: FakeInternetBox, entry: MockConfigEntry
+) -> None:
+    _run(hass, hass.config_entries.async_setup(entry.entry_id))
+    _run(hass, hass.async_block_till_done())
+    coordinator: InternetBoxDataCoordinator = hass.data[DOMAIN][entry.entry_id]
+    macs = list(coordinator.hosts)
+    active = True
+
+    # Every host flips presence, so every tracker writes its state.
+    def _flip_all() -> None:
+        nonlocal active
+        active = not active
+        coordinator.async_apply_host_events(
+            [HostEvent("changed", mac, {"Active": active}) for mac in macs]
+        )
+        _run(hass, hass.async_block_till_done())
+
+    benchmark(_flip_all)
+
+    assert len(hass.states.async_entity_ids("device_tracker")) == len(box.hosts)
+    _run(hass, hass.config_entries.async_unload(entry.entry_id))
+    _run(hass, hass.async_block_till_done())
@@ -0,0 +1,53 @@
+"""Allocations of a steady-state host table refresh over 2,000 synthetic hosts."""
+
+from __future__ import annotations
+
+import pytest
+from custom_components.swisscom_internetbox.api import HostEntry, parse_host
+
+from .memory import peak_allocation
+from .test_host_table import _raw_hosts
+
+HOST_COUNT = 2000
+
+
+def _parse(
+    raw: list[dict], previous: dict[str, HostEntry] | None
+) -> dict[str, HostEntry]:
+    hosts = {}
+    for d in raw:
+        if (host := parse_host(d, previous)) is not None:
+            hosts[host.mac] = host
+    return hosts
+
+
+@pytest.fixture(name="raw")
+def raw_fixture() -> list[dict]:
+    return _raw_hosts(HOST_COUNT)
+
+
+def test_steady_state_refresh_reuses_entries(raw) -> None:
+    previous = _parse(raw, None)
+    hosts = _parse(raw, previous)
+
+    assert all(hosts[mac] is previous[mac] for mac in previous)
+
+
+@pytest.mark.benchmark(group="host-table-memory")
+def test_refresh_allocations_fresh(benchmark, raw) -> None:
+    _parse(raw, None)
+    peak = peak_allocation(lambda: _parse(raw, None))
+    benchmark.extra_info["peak_bytes"] = peak
+    benchmark(_parse, raw, None)
+
+
+@pytest.mark.benchmark(group="host-table-memory")
+def test_refresh_allocations_reused(benchmark, raw) -> None:
+    previous = _parse(raw, None)
+    fresh_peak = peak_allocation(lambda: _parse(raw, None))
+    peak = peak_allocation(lambda: _parse(raw, previous))
+    benchmark.extra_info["peak_bytes"] = peak
+
+    # Only the new mapping is allocated; every HostEntry is reused.
+    assert peak < fresh_peak / 2
+    benchmark(_parse, raw, previous)
@@ -0,0 +1,146 @@
+"""Decoding a large ``Devices:get`` response, whole versus streamed.
+
+Each host is shaped like the objects a real box returns: many more fields
+than the integration reads, with nested name, type and address lists.
+``whole`` decodes the full body into one tree before picking the fields;
+``streamed`` feeds the body in 64 KiB chunks and decodes one host at a time.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from custom_components.swisscom_internetbox.api import (
+    STREAM_CHUNK_SIZE,
+    HostEntry,
+    parse_host,
+)
+from custom_components.swisscom_internetbox.jsonstream import StatusArrayParser
+from homeassistant.util.json import json_loads
+
+from .memory import peak_allocation
+
+
+def _host(i: int) -> dict:
+    mac = f"AA:BB:CC:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}"
+    ip = f"10.{i >> 16 & 0xFF}.{i >> 8 & 0xFF}.{i & 0xFF}"
+    return {
+        "Key": mac,
+        "DiscoverySource": "import",
+        "Name": f"host-{i}",
+        "DeviceType": "Computer",
+        "Active": i % 2 == 0,
+        "Tags": "lan edev mac physical eth ipv4 ipv6 dhcp events",
+        "FirstSeen": "2024-01-01T08:00:00Z",
+        "LastConnection": "2024-03-01T12:34:56Z",
+        "LastChanged": "2024-03-01T12:34:56Z",
+        "Master": "",
+        "VendorClassID": "MSFT 5.0",
+        "UserClassID": "",
+        "ClientID": f"01:{mac}",
+        "SerialNumber": "",
+        "ProductClass": "",
+        "OUI": "",
+        "DHCPOption55": "1,3,6,15,31,33,43,44,46,47,119,121,249,252",
+        "IPAddress": ip,
+        "IPAddressSource": "DHCP",
+        "Location": "",
+        "PhysAddress": mac,
+        "Layer2Interface": "ETH2",
+        "InterfaceName": "ETH2",
+        "MACVendor": "",
+        "Index": str(i),
+        "Actions": [],
+        "Names": [
+            {"Name": f"host-{i}", "Source": "dhcp", "Id": "dhcp"},
+            {"Name": f"PC-{i}", "Source": "mdns", "Id": "mdns"},
+            {"Name": mac, "Source": "default", "Id": "default"},
+        ],
+        "DeviceTypes": [
+            {"Type": "Computer", "Source": "dhcp", "Id": "dhcp"},
+        ],
+        "IPv4Address": [
+            {
+                "Address": ip,
+                "Status": "reachable",
+                "Scope": "global",
+                "AddressSource": "DHCP",
+                "Reserved": False,
+                "Id": "IPv4Address-1",
+            }
+        ],
+        "IPv6Address": [
+            {
+                "Address": f"fe80::a8bb:ccff:fe{i >> 8 & 0xFF:02x}:{i & 0xFF:02x}00",
+                "Status": "reachable",
+                "Scope": "link",
+                "AddressSource": "Other",
+                "Id": "IPv6Address-1",
+            }
+        ],
+        "Locations": [],
+        "Groups": [],
+        "SSW": {"Capability": "", "CurrentMode": "", "UplinkType": ""},
+        "Priority": {"Configuration": "None", "Type": ""},
+        "MDNSService": [
+            {"Name": f"PC-{i}", "ServiceName": "_smb._tcp", "Domain": "local"}
+        ],
+        "Children": [],
+    }
+
+
+def _body(count: int) -> bytes:
+    return json.dumps({"status": [_host(i) for i in range(count)]}).encode()
+
+
+def _whole(body: bytes) -> dict[str, HostEntry]:
+    hosts = {}
+    for d in json_loads(body)["status"]:
+        if (host := parse_host(d)) is not None:
+            hosts[host.mac] = host
+    return hosts
+
+
+def _streamed(body: bytes) -> dict[str, HostEntry]:
+    hosts = {}
+
+    def _add_host(d: dict) -> None:
+        if (host := parse_host(d)) is not None:
+            hosts[host.mac] = host
+
+    parser = StatusArrayParser(_add_host)
+    # Sliced from a memoryview, as chunks arriving from the socket would be.
+    view = memoryview(body)
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        parser.feed(view[start : start + STREAM_CHUNK_SIZE])
+    parser.close()
+    return hosts
+
+
+@pytest.fixture(name="body", params=[1000, 5000], ids=lambda count: f"{count}-hosts")
+def body_fixture(request: pytest.FixtureRequest) -> bytes:
+    return _body(request.param)
+
+
+def test_streamed_matches_whole(body) -> None:
+    assert _streamed(body) == _whole(body)
+
+
+@pytest.mark.benchmark(group="host-parsing")
+def test_parse_whole(benchmark, body) -> None:
+    benchmark.extra_info["body_bytes"] = len(body)
+    benchmark.extra_info["peak_bytes"] = peak_allocation(lambda: _whole(body))
+    benchmark(_whole, body)
+
+
+@pytest.mark.benchmark(group="host-parsing")
+def test_parse_streamed(benchmark, body) -> None:
+    whole_peak = peak_allocation(lambda: _whole(body))
+    peak = peak_allocation(lambda: _streamed(body))
+    benchmark.extra_info["body_bytes"] = len(body)
+    benchmark.extra_info["peak_bytes"] = peak
+
+    # Only one host object is decoded at a time, not the whole table.
+    assert peak < whole_peak / 2
+    benchmark(_streamed, body)
@@ -0,0 +1,76 @@
+"""Host table refresh cost with 1,000 synthetic hosts.
+
+``linear`` reproduces the lookups done before the host table was keyed by MAC:
+every tracker scanned the whole list and lower-cased both MACs.
+"""
+
+from __future__ import annotations
+
+import pytest
+from custom_components.swisscom_internetbox.api import HostEntry, parse_host
+from custom_components.swisscom_internetbox.coordinator import diff_hosts
+
+HOST_COUNT = 1000
+
+
+def _raw_hosts(count: int, active_every: int = 2) -> list[dict]:
+    return [
+        {
+            "Key": f"AA:BB:CC:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}",
+            "PhysAddress": (
+                f"AA:BB:CC:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}"
+            ),
+            "IPAddress": f"10.{i >> 16 & 0xFF}.{i >> 8 & 0xFF}.{i & 0xFF}",
+            "Name": f"host-{i}",
+            "Active": i % active_every == 0,
+            "DeviceType": "Computer",
+        }
+        for i in range(count)
+    ]
+
+
+def _linear_refresh(raw: list[dict], macs: list[str]) -> list[HostEntry | None]:
+    devices = [host for d in raw if (host := parse_host(d)) is not None]
+    found = []
+    for mac in macs:
+        match = None
+        for d in devices:
+            if (d.mac or "").lower() == mac.lower():
+                match = d
+                break
+        found.append(match)
+    return found
+
+
+def _indexed_refresh(
+    raw: list[dict], macs: list[str], previous: dict[str, HostEntry]
+) -> list[HostEntry | None]:
+    hosts = {host.mac: host for d in raw if (host := parse_host(d)) is not None}
+    delta = diff_hosts(previous, hosts)
+    changed = delta.added | delta.changed.keys()
+    return [hosts.get(mac) for mac in macs if mac in changed]
+
+
+@pytest.fixture(name="raw")
+def raw_fixture() -> list[dict]:
+    return _raw_hosts(HOST_COUNT)
+
+
+@pytest.fixture(name="macs")
+def macs_fixture(raw: list[dict]) -> list[str]:
+    return [d["PhysAddress"].lower() for d in raw]
+
+
+@pytest.mark.benchmark(group="host-table-refresh")
+def test_refresh_linear(benchmark, raw, macs) -> None:
+    found = benchmark(_linear_refresh, raw, macs)
+    assert all(found)
+
+
+@pytest.mark.benchmark(group="host-table-refresh")
+def test_refresh_indexed(benchmark, raw, macs) -> None:
+    previous = {
+        host.mac: host for d in _raw_hosts(HOST_COUNT, 3) if (host := parse_host(d))
+    }
+    found = benchmark(_indexed_refresh, raw, macs, previous)
+    assert found
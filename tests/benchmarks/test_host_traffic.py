@@ -0,0 +1,27 @@
+"""Per-host rate computation for 1,000 Wi-Fi stations."""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+from custom_components.swisscom_internetbox.rates import HostTrafficRates
+
+HOST_COUNT = 1000
+
+
+@pytest.mark.benchmark(group="host-traffic")
+def test_update_rates(benchmark) -> None:
+    rates = HostTrafficRates()
+    macs = [f"aa:bb:cc:00:{i >> 8:02x}:{i & 0xFF:02x}" for i in range(HOST_COUNT)]
+    rates.update(0, dict.fromkeys(macs, (0, 0)))
+    clock = itertools.count(1)
+
+    def _sample() -> set[str]:
+        t = next(clock)
+        return rates.update(
+            t * 60, {mac: (t * 1000 * (i + 1), t * 10) for i, mac in enumerate(macs)}
+        )
+
+    benchmark(_sample)
+    assert rates.rates(macs[0])[1] is not None
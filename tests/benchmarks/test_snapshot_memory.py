@@ -0,0 +1,93 @@
+"""Memory one entry keeps for the device info, WAN and DSL payloads."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from custom_components.swisscom_internetbox.api import (
+    parse_box_info,
+    parse_dsl_stats,
+    parse_wan_status,
+)
+from homeassistant.util.json import json_loads
+
+from swisscom_internetbox.test_config_flow import DEVICE_INFO
+
+from .memory import retained_allocation
+
+# Response bodies in the shape the box sends them.
+BODIES = {
+    "device_info": json.dumps({"status": DEVICE_INFO}).encode(),
+    "wan_info": json.dumps(
+        {
+            "status": True,
+            "data": {
+                "LinkType": "dsl",
+                "LinkState": "up",
+                "MACAddress": "A0:B5:49:C3:94:E1",
+                "Protocol": "dhcp",
+                "ConnectionState": "Bound",
+                "LastConnectionError": "None",
+                "IPAddress": "85.6.164.38",
+                "RemoteGateway": "85.6.160.1",
+                "DNSServers": "195.186.4.162,195.186.1.162",
+                "IPv6Address": "2a02:1210:2e00:6e00:a2b5:49ff:fec3:94e1",
+                "IPv6DelegatedPrefix": "2a02:1210:2e00:6e00::/56",
+            },
+        }
+    ).encode(),
+    "dsl_info": json.dumps(
+        {
+            "status": {
+                "stats": {
+                    "BytesReceived": 183_552_309_112,
+                    "BytesSent": 20_871_553_096,
+                    "ReceiveBlocks": 1_211_844_110,
+                    "TransmitBlocks": 160_229_417,
+                    "CellDelin": 0,
+                    "LinkRetrain": 2,
+                    "InitErrors": 0,
+                    "InitTimeouts": 0,
+                    "LossOfFraming": 0,
+                    "ErroredSecs": 17,
+                    "SeverelyErroredSecs": 1,
+                    "FECErrors": 48_123,
+                    "ATUCFECErrors": 912,
+                    "HECErrors": 0,
+                    "ATUCHECErrors": 0,
+                    "CRCErrors": 301,
+                    "ATUCCRCErrors": 12,
+                }
+            }
+        }
+    ).encode(),
+}
+PARSERS: dict[str, Callable[[Any], Any]] = {
+    "device_info": parse_box_info,
+    "wan_info": parse_wan_status,
+    "dsl_info": parse_dsl_stats,
+}
+
+
+def _raw() -> dict[str, Any]:
+    return {key: json_loads(body) for key, body in BODIES.items()}
+
+
+def _slim() -> dict[str, Any]:
+    return {key: PARSERS[key](json_loads(body)) for key, body in BODIES.items()}
+
+
+@pytest.mark.benchmark(group="snapshot-memory")
+def test_slim_payloads_retain_less(benchmark) -> None:
+    _raw(), _slim()
+    raw = retained_allocation(_raw)
+    slim = retained_allocation(_slim)
+    benchmark.extra_info["raw_bytes_per_entry"] = raw
+    benchmark.extra_info["slim_bytes_per_entry"] = slim
+
+    # Only about a dozen fields are kept; the raw payloads are released.
+    assert slim < raw / 4
+    benchmark(_slim)
@@ -1,6 +1,16 @@
 import pytest
 
+from .simulator import FakeInternetBox
+
 
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     yield
+
+
+@pytest.fixture(name="fake_box")
+async def fake_box_fixture(socket_enabled):
+    box = FakeInternetBox()
+    await box.start()
+    yield box
+    await box.close()
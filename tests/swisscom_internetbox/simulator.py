@@ -0,0 +1,240 @@
+"""Local stand-in for the InternetBox sysbus API."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+PASSWORD = "my-password"
+
+PERMISSION_DENIED = {
+    "status": None,
+    "errors": [{"error": 13, "description": "Permission denied", "info": ""}],
+}
+
+
+class FakeInternetBox:
+    def __init__(self) -> None:
+        self.hosts: list[dict[str, Any]] = []
+        self.device_info: dict[str, Any] = {
+            "ModelName": "IB3-00",
+            "SerialNumber": "5.1P2334B0308410",
+            "SoftwareVersion": "14.00.52",
+            "UpTime": 1314812,
+            "ExternalIPAddress": "85.6.164.38",
+            "MACAddress": "A0:B5:49:C3:94:E0",
+        }
+        self.wan_status: dict[str, Any] = {
+            "status": True,
+            "data": {
+                "LinkState": "up",
+                "LinkType": "dsl",
+                "IPAddress": "85.6.164.38",
+            },
+        }
+        self.dsl_stats: dict[str, Any] = {
+            "status": {"stats": {"BytesReceived": 1000, "BytesSent": 500}}
+        }
+        # Wi-Fi station MAC -> (RxBytes, TxBytes) as counted by the access point.
+        self.stations: dict[str, tuple[int, int]] = {}
+        self.context_id: str | None = None
+        self.logins = 0
+        self.latency = 0.0
+        # Injected failures: request keys (as recorded in ``requests``) answered
+        # with the given HTTP status, plus a random failure rate for sysbus calls.
+        self.errors: dict[str, int] = {}
+        self.error_rate = 0.0
+        # Body of injected error responses; JSON unless set, like the HTML
+        # error pages of the box's web server.
+        self.error_body: str | None = None
+        self._random = random.Random(0)
+        self.event_hold_seconds = 1.0
+        self.requests: list[str] = []
+        self._events: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._server: TestServer | None = None
+
+        app = web.Application()
+        app.router.add_post("/ws", self._handle_ws)
+        app.router.add_post("/sysbus/{path:.*}", self._handle_sysbus)
+        self._app = app
+
+    @property
+    def host(self) -> str:
+        assert self._server is not None
+        return f"{self._server.host}:{self._server.port}"
+
+    async def start(self) -> None:
+        self._server = TestServer(self._app)
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            await self._server.close()
+
+    def add_host(
+        self,
+        mac: str,
+        ip: str | None = None,
+        name: str | None = None,
+        active: bool = True,
+        device_type: str = "Computer",
+        tags: str = "lan edev mac physical",
+    ) -> dict[str, Any]:
+        host = {
+            "Key": mac.upper(),
+            "Tags": tags,
+            "PhysAddress": mac.upper(),
+            "IPAddress": ip,
+            "Name": name or mac,
+            "Active": active,
+            "DeviceType": device_type,
+        }
+        self.hosts.append(host)
+        return host
+
+    def add_hosts(self, count: int, active_every: int = 2) -> None:
+        """Add ``count`` synthetic hosts, every ``active_every``-th one online."""
+        for i in range(len(self.hosts), len(self.hosts) + count):
+            octets = (i >> 16 & 0xFF, i >> 8 & 0xFF, i & 0xFF)
+            self.add_host(
+                "aa:bb:cc:" + ":".join(f"{octet:02x}" for octet in octets),
+                ip="10.{}.{}.{}".format(*octets),
+                name=f"host-{i}",
+                active=i % active_every == 0,
+            )
+
+    def push_event(self, handler: str, reason: str, attributes: dict[str, Any]) -> None:
+        """Queue an event for the next long-poll on the event channel."""
+        self._events.put_nowait(
+            {
+                "handler": handler,
+                "object": {"reason": reason, "attributes": attributes},
+            }
+        )
+
+    def expire_session(self) -> None:
+        """Drop the current session, as the box does after its idle timeout."""
+        self.context_id = None
+
+    def _authorized(self, request: web.Request) -> bool:
+        return (
+            self.context_id is not None
+            and request.headers.get("X-Context") == self.context_id
+        )
+
+    async def _handle_ws(self, request: web.Request) -> web.Response:
+        body = json.loads(await request.text())
+        key = f"/ws:{body.get('method') or 'events'}"
+        self.requests.append(key)
+        if (status := self.errors.get(key)) is not None:
+            return self._error_response(status)
+
+        if request.headers.get("Authorization") == "X-Sah-Login":
+            if body["parameters"]["password"] != PASSWORD:
+                return web.json_response({"errors": []}, status=401)
+            self.logins += 1
+            self.context_id = f"context-{self.logins}"
+            response = web.json_response(
+                {"status": 0, "data": {"contextID": self.context_id}}
+            )
+            response.set_cookie("sessid", "fake-session")
+            return response
+
+        if not self._authorized(request):
+            return web.json_response(PERMISSION_DENIED)
+
+        if "events" in body:
+            return web.json_response(
+                {"channelid": body.get("channelid") or 1, "events": await self._drain()}
+            )
+
+        return web.json_response({"status": True})
+
+    def _error_response(self, status: int) -> web.Response:
+        if self.error_body is not None:
+            return web.Response(
+                text=self.error_body, status=status, content_type="text/html"
+            )
+        return web.json_response({"errors": []}, status=status)
+
+    async def _drain(self) -> list[dict[str, Any]]:
+        try:
+            first = await asyncio.wait_for(self._events.get(), self.event_hold_seconds)
+        except TimeoutError:
+            return []
+
+        events = [{"data": first}]
+        while not self._events.empty():
+            events.append({"data": self._events.get_nowait()})
+        return events
+
+    async def _handle_sysbus(self, request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+        key = f"/sysbus/{path}"
+        self.requests.append(key)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        body = json.loads(await request.text())
+        status = self.errors.get(key)
+        if (
+            status is None
+            and self.error_rate
+            and self._random.random() < self.error_rate
+        ):
+            status = 500
+        if status is not None:
+            return self._error_response(status)
+
+        if not self._authorized(request):
+            return web.json_response(PERMISSION_DENIED)
+
+        if path == "Devices:get":
+            expression = body["parameters"].get("expression", "")
+            return web.json_response(
+                {"status": [h for h in self.hosts if _matches(h, expression)]}
+            )
+        if path == "DeviceInfo:get":
+            return web.json_response({"status": self.device_info})
+        if path == "NMC:getWANStatus":
+            return web.json_response(self.wan_status)
+        if path == "NeMo/Intf/dsl0:getDSLChannelStats":
+            return web.json_response(self.dsl_stats)
+        if path == "NeMo/Intf/lan:getMIBs":
+            return web.json_response(self._wlanvap_mibs())
+        return web.json_response({"errors": []}, status=404)
+
+    def _wlanvap_mibs(self) -> dict[str, Any]:
+        stations = {
+            str(i): {"MACAddress": mac.upper(), "RxBytes": rx, "TxBytes": tx}
+            for i, (mac, (rx, tx)) in enumerate(self.stations.items(), 1)
+        }
+        return {
+            "status": {
+                "wlanvap": {
+                    "wl0": {"SSID": "InternetBox", "AssociatedDevice": stations},
+                    "wl1": {"SSID": "InternetBox", "AssociatedDevice": {}},
+                }
+            }
+        }
+
+
+def _matches(host: dict[str, Any], expression: str) -> bool:
+    """Evaluate the ``and``-joined tag terms of a sysbus host expression."""
+    tags = host["Tags"].split()
+    for term in expression.replace("(", "").replace(")", "").split(" and "):
+        term = term.strip()
+        if term == ".Active==true":
+            matched = host["Active"]
+        elif term.startswith("not "):
+            matched = term[4:] not in tags
+        else:
+            matched = not term or term in tags
+        if not matched:
+            return False
+    return True
@@ -0,0 +1,283 @@
+import asyncio
+
+import pytest
+from custom_components.swisscom_internetbox.api import (
+    PATH_DEVICES,
+    PATH_DSL_STATS,
+    PATH_WAN_STATUS,
+    InternetBoxClient,
+    hosts_expression,
+)
+from custom_components.swisscom_internetbox.errors import (
+    CannotConnectException,
+    EndpointNotFoundException,
+    NoActiveSessionException,
+    SwisscomInetboxException,
+)
+from custom_components.swisscom_internetbox.scheduler import (
+    PRIORITY_TIMEOUTS,
+    Priority,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .simulator import PASSWORD, FakeInternetBox
+
+
+def _client(
+    hass: HomeAssistant, fake_box: FakeInternetBox, store: Store | None = None
+) -> InternetBoxClient:
+    return InternetBoxClient(
+        hass, host=fake_box.host, password=PASSWORD, ssl=False, session_store=store
+    )
+
+
+async def test_native_client_fetches_endpoints(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    fake_box.add_host("AA:BB:CC:DD:EE:01", ip="192.168.1.10", name="phone")
+    client = _client(hass, fake_box)
+
+    hosts = await client.async_get_hosts()
+    info = await client.async_get_device_info()
+    wan = await client.async_get_wan_info()
+
+    assert hosts["aa:bb:cc:dd:ee:01"].hostname == "phone"
+    assert info.model_name == "IB3-00"
+    assert wan.link_state == "up"
+    assert fake_box.requests.count("/ws:createContext") == 1
+
+
+async def test_persisted_session_skips_login(
+    hass: HomeAssistant, fake_box: FakeInternetBox, hass_storage
+) -> None:
+    store = Store(hass, 1, "swisscom_internetbox.test.session")
+    await _client(hass, fake_box, store).async_get_device_info()
+    assert fake_box.requests.count("/ws:createContext") == 1
+
+    # A new client, as after a restart or reload, reuses the stored session.
+    await _client(hass, fake_box, store).async_get_device_info()
+    assert fake_box.requests.count("/ws:createContext") == 1
+
+
+async def test_expired_session_is_renewed_within_the_call(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = _client(hass, fake_box)
+    await client.async_get_device_info()
+    fake_box.expire_session()
+
+    wan = await client.async_get_wan_info()
+
+    assert wan.link_state == "up"
+    assert fake_box.logins == 2
+
+
+async def test_concurrent_callers_share_one_login(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = _client(hass, fake_box)
+    await client.async_get_device_info()
+    fake_box.expire_session()
+
+    await asyncio.gather(
+        client.async_get_hosts(),
+        client.async_get_device_info(),
+        client.async_get_wan_info(),
+        client.async_get_dsl_info(),
+    )
+
+    assert fake_box.logins == 2
+
+
+async def test_missing_endpoint_is_reported_as_not_found(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = _client(hass, fake_box)
+    fake_box.errors[PATH_DSL_STATS] = 404
+    with pytest.raises(EndpointNotFoundException):
+        await client.async_get_dsl_info()
+
+
+async def test_non_json_error_pages_are_client_errors(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = _client(hass, fake_box)
+    await client.async_get_device_info()
+    fake_box.error_body = "<html><body>Internal Server Error</body></html>"
+
+    fake_box.errors[PATH_WAN_STATUS] = 500
+    with pytest.raises(SwisscomInetboxException):
+        await client.async_get_wan_info()
+    fake_box.errors["/ws:events"] = 500
+    with pytest.raises(SwisscomInetboxException):
+        await client.async_get_events(["Devices"])
+
+    # A rejected session still leads to a new login.
+    fake_box.errors[PATH_WAN_STATUS] = 401
+    with pytest.raises(NoActiveSessionException):
+        await client.async_get_wan_info()
+    assert fake_box.logins == 2
+
+
+async def test_late_rejection_keeps_the_new_session(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = _client(hass, fake_box)
+    await client.async_get_wan_info()
+    transport = client._transport
+
+    fake_box.latency = 0.1
+    fake_box.errors[PATH_WAN_STATUS] = 401
+    late = asyncio.create_task(transport.async_call(PATH_WAN_STATUS, {}))
+    await asyncio.sleep(0.05)
+    # Logged in again while the request on the old session is in flight.
+    await transport.async_login()
+    with pytest.raises(NoActiveSessionException):
+        await late
+
+    assert transport.session_state["context_id"] == fake_box.context_id
+
+
+async def test_client_records_request_metrics(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = _client(hass, fake_box)
+    await client.async_get_wan_info()
+    fake_box.expire_session()
+    await client.async_get_wan_info()
+    fake_box.errors["/sysbus/NeMo/Intf/dsl0:getDSLChannelStats"] = 500
+    with pytest.raises(SwisscomInetboxException):
+        await client.async_get_dsl_info()
+
+    wan = client.metrics.endpoint(PATH_WAN_STATUS)
+    assert wan.requests == 3
+    assert wan.errors == 1
+    assert wan.last_payload_bytes > 0
+    assert wan.latency(0.5) is not None
+    assert client.metrics.endpoint(PATH_DSL_STATS).errors == 1
+    assert client.metrics.logins == 2
+    assert client.metrics.relogins == 1
+
+
+async def test_host_traffic_is_fetched_in_one_call(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    fake_box.stations = {"aa:bb:cc:dd:ee:01": (100, 2000), "aa:bb:cc:dd:ee:02": (5, 6)}
+    client = _client(hass, fake_box)
+
+    traffic = await client.async_get_host_traffic()
+
+    assert traffic == {"aa:bb:cc:dd:ee:01": (2000, 100), "aa:bb:cc:dd:ee:02": (6, 5)}
+    assert fake_box.requests.count("/sysbus/NeMo/Intf/lan:getMIBs") == 1
+
+
+async def test_hosts_are_filtered_on_the_box(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    fake_box.add_host("AA:BB:CC:DD:EE:00", name="box", tags="lan self")
+    fake_box.add_host("AA:BB:CC:DD:EE:01", name="phone")
+    fake_box.add_host("AA:BB:CC:DD:EE:02", name="old laptop", active=False)
+    client = _client(hass, fake_box)
+    active_client = InternetBoxClient(
+        hass,
+        host=fake_box.host,
+        password=PASSWORD,
+        ssl=False,
+        hosts_expression=hosts_expression(active_only=True),
+    )
+
+    hosts = await client.async_get_hosts()
+    active = await active_client.async_get_hosts()
+
+    assert hosts.keys() == {"aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:02"}
+    assert active.keys() == {"aa:bb:cc:dd:ee:01"}
+    assert (
+        active_client.metrics.endpoint(PATH_DEVICES).last_payload_bytes
+        < client.metrics.endpoint(PATH_DEVICES).last_payload_bytes
+    )
+
+
+async def test_legacy_client_loads_adapter_on_first_call(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    client = InternetBoxClient(
+        hass, host=fake_box.host, password=PASSWORD, ssl=False, use_executor=True
+    )
+    assert client._transport._adapter is None
+
+    info = await client.async_get_device_info()
+
+    assert info.model_name == "IB3-00"
+    assert client._transport._adapter is not None
+
+
+@pytest.mark.parametrize("use_executor", [False, True])
+async def test_unreachable_box_raises_cannot_connect(
+    hass: HomeAssistant, fake_box: FakeInternetBox, use_executor: bool
+) -> None:
+    host = fake_box.host
+    await fake_box.close()
+    client = InternetBoxClient(
+        hass, host=host, password=PASSWORD, ssl=False, use_executor=use_executor
+    )
+
+    with pytest.raises(CannotConnectException):
+        await client.async_get_device_info()
+
+
+async def test_identical_calls_in_flight_share_one_request(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    fake_box.add_host("AA:BB:CC:DD:EE:01", name="phone")
+    fake_box.latency = 0.05
+    client = _client(hass, fake_box)
+
+    first, second = await asyncio.gather(
+        client.async_get_hosts(), client.async_get_hosts()
+    )
+    await asyncio.gather(client.async_get_wan_info(), client.async_get_wan_info())
+
+    assert first is second
+    assert fake_box.requests.count("/sysbus/Devices:get") == 1
+    assert fake_box.requests.count("/sysbus/NMC:getWANStatus") == 1
+    assert client.metrics.endpoint(PATH_WAN_STATUS).coalesced == 1
+
+    # Without a freshness window, the next call asks the box again.
+    await client.async_get_wan_info()
+    assert fake_box.requests.count("/sysbus/NMC:getWANStatus") == 2
+
+
+async def test_fresh_results_are_reused_within_max_age(
+    hass: HomeAssistant, fake_box: FakeInternetBox, freezer
+) -> None:
+    client = InternetBoxClient(
+        hass, host=fake_box.host, password=PASSWORD, ssl=False, max_age=5
+    )
+
+    await client.async_get_wan_info()
+    await client.async_get_wan_info()
+    assert fake_box.requests.count("/sysbus/NMC:getWANStatus") == 1
+    assert client.metrics.endpoint(PATH_WAN_STATUS).cached == 1
+
+    # The host table is always asked for.
+    await client.async_get_hosts()
+    await client.async_get_hosts()
+    assert fake_box.requests.count("/sysbus/Devices:get") == 2
+
+    freezer.tick(6)
+    await client.async_get_wan_info()
+    assert fake_box.requests.count("/sysbus/NMC:getWANStatus") == 2
+
+
+async def test_request_timeout_covers_queue_and_box(
+    hass: HomeAssistant, fake_box: FakeInternetBox, monkeypatch
+) -> None:
+    client = _client(hass, fake_box)
+    await client.async_get_device_info()
+    monkeypatch.setitem(PRIORITY_TIMEOUTS, Priority.STATUS, 0.05)
+    fake_box.latency = 0.5
+
+    with pytest.raises(SwisscomInetboxException, match="timed out"):
+        await client.async_get_wan_info()
+    assert client.metrics.endpoint(PATH_WAN_STATUS).errors == 1
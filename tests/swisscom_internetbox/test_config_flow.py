@@ -1,11 +1,17 @@
 from unittest.mock import patch
 
 import pytest
-from custom_components.swisscom_internetbox.const import DOMAIN
+from custom_components.swisscom_internetbox.const import (
+    CONF_CONSIDER_HOME,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    DOMAIN,
+)
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_SSL, CONF_VERIFY_SSL
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 DEVICE_INFO = {
     "Manufacturer": "Arcadyan",
@@ -44,18 +50,17 @@ DEVICE_INFO = {
 @pytest.fixture(name="create_session")
 def mock_create_session():
     with patch(
-        "custom_components.swisscom_internetbox.api.InternetBoxClient.create_session",
+        "custom_components.swisscom_internetbox.api.SysbusTransport.async_login",
     ) as service_mock:
-        service_mock.return_value = 200
         yield service_mock
 
 
 @pytest.fixture(name="get_device_info")
 def mock_get_device_info():
     with patch(
-        "custom_components.swisscom_internetbox.api.InternetBoxClient.get_device_info",
+        "custom_components.swisscom_internetbox.api.SysbusTransport.async_call",
     ) as service_mock:
-        service_mock.return_value = DEVICE_INFO
+        service_mock.return_value = {"status": DEVICE_INFO}
         yield service_mock
 
 
@@ -88,3 +93,31 @@ async def test_config_flow_user(
     assert result["data"].get(CONF_HOST) == "my-host"
     assert result["data"].get(CONF_SSL)
     assert result["data"][CONF_PASSWORD] == "my-password"
+
+
+async def test_options_flow_rejects_inverted_poll_bounds(hass: HomeAssistant) -> None:
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_HOST: "my-host"})
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_CONSIDER_HOME: 180,
+            CONF_MIN_POLL_INTERVAL: 120,
+            CONF_MAX_POLL_INTERVAL: 60,
+        },
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {CONF_MAX_POLL_INTERVAL: "max_below_min"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_CONSIDER_HOME: 180,
+            CONF_MIN_POLL_INTERVAL: 60,
+            CONF_MAX_POLL_INTERVAL: 120,
+        },
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_MAX_POLL_INTERVAL] == 120
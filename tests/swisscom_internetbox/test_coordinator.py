@@ -0,0 +1,429 @@
+import asyncio
+import dataclasses
+import datetime as dt
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from custom_components.swisscom_internetbox import coordinator as coordinator_module
+from custom_components.swisscom_internetbox.api import (
+    PATH_DSL_STATS,
+    BoxInfo,
+    DslStats,
+    HostEntry,
+    InternetBoxClient,
+    WanStatus,
+)
+from custom_components.swisscom_internetbox.breaker import BREAKER_COOLDOWN_SECONDS
+from custom_components.swisscom_internetbox.coordinator import (
+    InternetBoxDataCoordinator,
+    SnapshotStore,
+    build_summary,
+    diff_hosts,
+    host_topic,
+)
+from custom_components.swisscom_internetbox.errors import (
+    CannotConnectException,
+    EndpointNotFoundException,
+    SwisscomInetboxException,
+)
+from custom_components.swisscom_internetbox.scheduler import (
+    PRIORITY_TIMEOUTS,
+    Priority,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .simulator import PASSWORD, FakeInternetBox
+
+HOST = HostEntry(
+    mac="aa:bb:cc:dd:ee:01",
+    ip="192.168.1.10",
+    hostname="phone",
+    active=True,
+    type="Phone",
+)
+
+
+@pytest.fixture(name="client")
+def mock_client():
+    client = MagicMock()
+    client.async_get_hosts = AsyncMock(return_value={HOST.mac: HOST})
+    client.async_get_device_info = AsyncMock(return_value=BoxInfo(model_name="IB3-00"))
+    client.async_get_wan_info = AsyncMock(return_value=WanStatus(link_state="up"))
+    client.async_get_dsl_info = AsyncMock(return_value=DslStats())
+    client.async_close = AsyncMock()
+    return client
+
+
+async def test_refresh_fetches_all_endpoints(hass: HomeAssistant, client) -> None:
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["devices"] == {HOST.mac: HOST}
+    assert coordinator.get_host(HOST.mac.upper()) is HOST
+    assert coordinator.data["wan_info"].link_state == "up"
+    assert set(coordinator.endpoint_durations) == {
+        "devices",
+        "device_info",
+        "wan_info",
+        "dsl_info",
+    }
+
+
+async def test_refresh_polls_due_endpoints_only(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    freezer.tick(dt.timedelta(seconds=20))
+    await coordinator.async_refresh()
+
+    assert client.async_get_hosts.await_count == 2
+    assert client.async_get_wan_info.await_count == 1
+    assert client.async_get_dsl_info.await_count == 1
+    assert client.async_get_device_info.await_count == 1
+
+
+async def test_external_ip_follows_the_wan_status(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    client.async_get_wan_info.return_value = WanStatus(external_ip="85.6.164.38")
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+    assert coordinator.summary.external_ip == "85.6.164.38"
+
+    freezer.tick(dt.timedelta(seconds=40))
+    client.async_get_wan_info.return_value = WanStatus(external_ip="85.6.170.2")
+    await coordinator.async_refresh()
+
+    assert client.async_get_device_info.await_count == 1
+    assert coordinator.summary.external_ip == "85.6.170.2"
+
+
+async def test_refresh_notifies_changed_hosts_only(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    other = dataclasses.replace(HOST, mac="aa:bb:cc:dd:ee:02", hostname="laptop")
+    client.async_get_hosts.return_value = {HOST.mac: HOST, other.mac: other}
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    listeners = {
+        topic: MagicMock()
+        for topic in (
+            "devices",
+            "dsl_info",
+            host_topic(HOST.mac),
+            host_topic(other.mac),
+        )
+    }
+    unsubs = [
+        coordinator.async_add_listener(listener, frozenset({topic}))
+        for topic, listener in listeners.items()
+    ]
+
+    client.async_get_hosts.return_value = {
+        HOST.mac: dataclasses.replace(HOST, active=False),
+        other.mac: other,
+    }
+    freezer.tick(dt.timedelta(seconds=20))
+    await coordinator.async_refresh()
+
+    assert coordinator.host_delta.changed == {HOST.mac: frozenset({"active"})}
+    listeners["devices"].assert_called_once()
+    listeners[host_topic(HOST.mac)].assert_called_once()
+    listeners[host_topic(other.mac)].assert_not_called()
+    listeners["dsl_info"].assert_not_called()
+
+    # An unchanged host table notifies nobody.
+    freezer.tick(dt.timedelta(seconds=20))
+    await coordinator.async_refresh()
+    for unsub in unsubs:
+        unsub()
+
+    assert not coordinator.host_delta
+    listeners["devices"].assert_called_once()
+
+
+def test_diff_hosts() -> None:
+    removed = dataclasses.replace(HOST, mac="aa:bb:cc:dd:ee:02")
+    added = dataclasses.replace(HOST, mac="aa:bb:cc:dd:ee:03")
+    moved = dataclasses.replace(HOST, ip="192.168.1.11")
+
+    delta = diff_hosts(
+        {HOST.mac: HOST, removed.mac: removed}, {moved.mac: moved, added.mac: added}
+    )
+
+    assert delta.added == {added.mac}
+    assert delta.removed == {removed.mac}
+    assert delta.changed == {HOST.mac: frozenset({"ip"})}
+
+
+async def test_refresh_tolerates_partial_failure(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+    freezer.tick(dt.timedelta(hours=1))
+
+    client.async_get_dsl_info.side_effect = SwisscomInetboxException("no dsl")
+    client.async_get_wan_info.return_value = WanStatus(link_state="down")
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["wan_info"].link_state == "down"
+    assert coordinator.data["dsl_info"] == DslStats()
+
+
+async def test_refresh_fails_when_all_endpoints_fail(
+    hass: HomeAssistant, client
+) -> None:
+    err = SwisscomInetboxException("box unreachable")
+    for method in (
+        client.async_get_hosts,
+        client.async_get_device_info,
+        client.async_get_wan_info,
+        client.async_get_dsl_info,
+    ):
+        method.side_effect = err
+
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert isinstance(coordinator.last_exception, UpdateFailed)
+
+
+@pytest.mark.parametrize(
+    ("err", "success"),
+    [
+        (SwisscomInetboxException("timed out"), True),
+        (CannotConnectException("connection refused"), False),
+    ],
+)
+async def test_refresh_fails_on_the_only_due_endpoint_if_unreachable(
+    hass: HomeAssistant, client, freezer, err, success
+) -> None:
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    # Only the hosts are due; their failure alone is not the box going away.
+    freezer.tick(dt.timedelta(seconds=20))
+    client.async_get_hosts.side_effect = err
+    await coordinator.async_refresh()
+
+    assert client.async_get_wan_info.await_count == 1
+    assert coordinator.last_update_success is success
+    assert (coordinator.update_interval == dt.timedelta(seconds=15)) is success
+    assert coordinator.data["devices"] == {HOST.mac: HOST}
+
+
+async def test_breaker_skips_an_endpoint_that_keeps_failing(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    client.async_get_wan_info.side_effect = SwisscomInetboxException("HTTP 500")
+    for _ in range(3):
+        freezer.tick(dt.timedelta(minutes=1))
+        await coordinator.async_refresh()
+    assert client.async_get_wan_info.await_count == 3
+    assert coordinator.breaker_states()["wan_info"]["failures"] == 3
+
+    # Open: the endpoint costs no requests while the others keep flowing.
+    freezer.tick(dt.timedelta(minutes=1))
+    await coordinator.async_refresh()
+    assert client.async_get_wan_info.await_count == 3
+    assert client.async_get_hosts.await_count == 4
+    assert coordinator.last_update_success
+
+    # After the cooling period a single trial request closes it again.
+    client.async_get_wan_info.side_effect = None
+    freezer.tick(dt.timedelta(seconds=BREAKER_COOLDOWN_SECONDS))
+    await coordinator.async_refresh()
+    assert client.async_get_wan_info.await_count == 4
+    assert coordinator.breaker_states() == {}
+
+
+async def test_breaker_opens_at_once_for_missing_endpoint(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    client.async_get_dsl_info.side_effect = EndpointNotFoundException(
+        "Object or parameter not found"
+    )
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+    assert coordinator.breaker_states()["dsl_info"]["open_for"] == (
+        BREAKER_COOLDOWN_SECONDS
+    )
+
+    # A failed trial request doubles the cooling period.
+    freezer.tick(dt.timedelta(seconds=BREAKER_COOLDOWN_SECONDS))
+    await coordinator.async_refresh()
+    assert client.async_get_dsl_info.await_count == 2
+    assert coordinator.breaker_states()["dsl_info"]["open_for"] == (
+        2 * BREAKER_COOLDOWN_SECONDS
+    )
+
+
+async def test_breaker_ignores_failures_of_the_whole_box(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    for method in (
+        client.async_get_hosts,
+        client.async_get_device_info,
+        client.async_get_wan_info,
+        client.async_get_dsl_info,
+    ):
+        method.side_effect = SwisscomInetboxException("box unreachable")
+    for _ in range(4):
+        await coordinator.async_refresh()
+        freezer.tick(dt.timedelta(hours=1))
+
+    assert not coordinator.last_update_success
+    assert coordinator.breaker_states() == {}
+
+
+async def test_refresh_gives_up_slow_endpoints_after_budget(
+    hass: HomeAssistant, client, monkeypatch
+) -> None:
+    monkeypatch.setattr(coordinator_module, "REFRESH_BUDGET_SECONDS", 0.05)
+    hang = asyncio.Event()
+    client.async_get_dsl_info.side_effect = hang.wait
+
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["devices"] == {HOST.mac: HOST}
+    assert coordinator.data["dsl_info"] is None
+    assert coordinator.breaker_states()["dsl_info"]["failures"] == 1
+
+
+async def test_request_timeouts_fire_within_the_refresh_budget(
+    hass: HomeAssistant, fake_box: FakeInternetBox, monkeypatch
+) -> None:
+    assert max(PRIORITY_TIMEOUTS.values()) < coordinator_module.REFRESH_BUDGET_SECONDS
+
+    monkeypatch.setitem(PRIORITY_TIMEOUTS, Priority.DIAGNOSTICS, 0.05)
+    fake_box.latency = 0.1
+    client = InternetBoxClient(hass, host=fake_box.host, password=PASSWORD, ssl=False)
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["dsl_info"] is None
+    assert client.metrics.endpoint(PATH_DSL_STATS).errors == 1
+
+
+async def test_snapshot_round_trip(hass: HomeAssistant, client) -> None:
+    client.async_get_dsl_info.return_value = DslStats(bytes_received=10)
+    store = SnapshotStore(hass, 2, "snapshot")
+    coordinator = InternetBoxDataCoordinator(hass, client, snapshot_store=store)
+    await coordinator.async_refresh()
+    await store.async_save(coordinator._snapshot())
+
+    restored = InternetBoxDataCoordinator(hass, client, snapshot_store=store)
+    assert await restored.async_restore_snapshot()
+    assert restored.data == coordinator.data
+    assert restored.summary == coordinator.summary
+
+
+def test_build_summary() -> None:
+    summary = build_summary(
+        {
+            "devices": {
+                HOST.mac: HOST,
+                "aa:bb:cc:dd:ee:02": dataclasses.replace(
+                    HOST, mac="aa:bb:cc:dd:ee:02", active=False
+                ),
+            },
+            "device_info": BoxInfo(model_name="IB3-00", uptime=42),
+            "wan_info": WanStatus(),
+            "dsl_info": DslStats(bytes_received=10, bytes_sent=5),
+        }
+    )
+
+    assert summary.connected_devices == 2
+    assert summary.online_devices == 1
+    assert summary.model == "IB3-00"
+    assert summary.uptime == 42
+    assert summary.wan_rx == 10
+    assert summary.link_state is None
+
+
+async def test_interval_backs_off_while_the_box_fails(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    coordinator = InternetBoxDataCoordinator(
+        hass, client, max_interval=dt.timedelta(seconds=60)
+    )
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == dt.timedelta(seconds=15)
+
+    endpoints = (
+        client.async_get_hosts,
+        client.async_get_device_info,
+        client.async_get_wan_info,
+        client.async_get_dsl_info,
+    )
+    for method in endpoints:
+        method.side_effect = CannotConnectException("connection refused")
+    intervals = []
+    for _ in range(4):
+        freezer.tick(coordinator.update_interval)
+        await coordinator.async_refresh()
+        intervals.append(coordinator.update_interval.total_seconds())
+
+    assert not coordinator.last_update_success
+    assert 15 < intervals[0] < intervals[1]
+    assert intervals[-1] == 60
+
+    for method in endpoints:
+        method.side_effect = None
+    freezer.tick(coordinator.update_interval)
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == dt.timedelta(seconds=15)
+
+
+async def test_interval_follows_host_activity(
+    hass: HomeAssistant, client, freezer
+) -> None:
+    coordinator = InternetBoxDataCoordinator(
+        hass, client, min_interval=dt.timedelta(seconds=5)
+    )
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == dt.timedelta(seconds=15)
+
+    # A host leaving speeds up host polling for a while.
+    client.async_get_hosts.return_value = {}
+    freezer.tick(dt.timedelta(seconds=15))
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == dt.timedelta(seconds=5)
+
+    # Once nothing changed for long enough, every interval is stretched.
+    freezer.tick(dt.timedelta(minutes=10))
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == dt.timedelta(seconds=30)
+
+
+async def test_refresh_derives_wan_rates(hass: HomeAssistant, client, freezer) -> None:
+    client.async_get_dsl_info.return_value = DslStats(bytes_received=0, bytes_sent=0)
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+    listener = MagicMock()
+    unsub = coordinator.async_add_listener(listener, frozenset({"wan_rate"}))
+
+    client.async_get_dsl_info.return_value = DslStats(
+        bytes_received=750_000, bytes_sent=75_000
+    )
+    freezer.tick(dt.timedelta(minutes=1))
+    await coordinator.async_refresh()
+    unsub()
+
+    listener.assert_called_once()
+    assert coordinator.summary.wan_rx_rate == 100_000
+    assert coordinator.summary.wan_tx_rate == 10_000
+    assert coordinator.summary.wan_rx == 750_000
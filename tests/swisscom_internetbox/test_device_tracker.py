@@ -0,0 +1,128 @@
+import datetime as dt
+from unittest.mock import MagicMock
+
+import pytest
+from custom_components.swisscom_internetbox.const import CONF_CONSIDER_HOME, DOMAIN
+from custom_components.swisscom_internetbox.device_tracker import DepartureTimer
+from custom_components.swisscom_internetbox.events import HostEvent
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_SSL,
+    CONF_VERIFY_SSL,
+    STATE_HOME,
+    STATE_NOT_HOME,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from .simulator import PASSWORD, FakeInternetBox
+
+MAC = "aa:bb:cc:dd:ee:01"
+
+
+@pytest.fixture(name="entry")
+def entry_fixture(hass: HomeAssistant, fake_box: FakeInternetBox) -> MockConfigEntry:
+    fake_box.add_host(MAC, ip="192.168.1.10", name="phone")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=fake_box.device_info["SerialNumber"],
+        data={
+            CONF_HOST: fake_box.host,
+            CONF_PASSWORD: PASSWORD,
+            CONF_SSL: False,
+            CONF_VERIFY_SSL: False,
+        },
+        options={CONF_CONSIDER_HOME: 60},
+    )
+    entry.add_to_hass(hass)
+    er.async_get(hass).async_get_or_create(
+        "device_tracker", DOMAIN, MAC, config_entry=entry, suggested_object_id="phone"
+    )
+    return entry
+
+
+def _fire(hass: HomeAssistant, seconds: float) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + dt.timedelta(seconds=seconds))
+
+
+async def test_departure_timer_fires_in_deadline_order(hass: HomeAssistant) -> None:
+    timer = DepartureTimer(hass, consider_home=60)
+    fired = []
+    for key in ("a", "b", "c"):
+        timer.async_schedule(key, lambda key=key: fired.append(key))
+    timer.async_cancel("b")
+
+    _fire(hass, 30)
+    assert fired == []
+    assert timer.is_pending("a")
+
+    _fire(hass, 61)
+    assert fired == ["a", "c"]
+    assert not timer.is_pending("a")
+    timer.async_stop()
+
+
+async def test_departure_timer_reschedule_replaces_deadline(
+    hass: HomeAssistant,
+) -> None:
+    timer = DepartureTimer(hass, consider_home=60)
+    action = MagicMock()
+    timer.async_schedule("a", action)
+    timer.async_cancel("a")
+    timer.async_schedule("a", action)
+
+    _fire(hass, 61)
+    action.assert_called_once()
+    timer.async_stop()
+
+
+async def test_tracker_stays_home_for_consider_home(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> None:
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert hass.states.get("device_tracker.phone").state == STATE_HOME
+
+    coordinator.async_apply_host_events([HostEvent("changed", MAC, {"Active": False})])
+    await hass.async_block_till_done()
+    assert hass.states.get("device_tracker.phone").state == STATE_HOME
+
+    # Coming back within the window cancels the departure.
+    coordinator.async_apply_host_events([HostEvent("changed", MAC, {"Active": True})])
+    _fire(hass, 61)
+    await hass.async_block_till_done()
+    assert hass.states.get("device_tracker.phone").state == STATE_HOME
+
+    coordinator.async_apply_host_events([HostEvent("changed", MAC, {"Active": False})])
+    _fire(hass, 30)
+    await hass.async_block_till_done()
+    assert hass.states.get("device_tracker.phone").state == STATE_HOME
+
+    _fire(hass, 61)
+    await hass.async_block_till_done()
+    assert hass.states.get("device_tracker.phone").state == STATE_NOT_HOME
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_tracker_for_host_without_device_type(
+    hass: HomeAssistant, entry: MockConfigEntry, fake_box: FakeInternetBox
+) -> None:
+    del fake_box.hosts[0]["DeviceType"]
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("device_tracker.phone")
+    assert state.state == STATE_HOME
+    assert state.attributes["icon"] == "mdi:help-network"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from custom_components.swisscom_internetbox import events as events_module
+from custom_components.swisscom_internetbox.api import InternetBoxClient
+from custom_components.swisscom_internetbox.coordinator import (
+    InternetBoxDataCoordinator,
+)
+from custom_components.swisscom_internetbox.events import InternetBoxEventListener
+from homeassistant.core import HomeAssistant
+
+from .simulator import PASSWORD, FakeInternetBox
+
+PHONE_MAC = "aa:bb:cc:dd:ee:01"
+LAPTOP_MAC = "aa:bb:cc:dd:ee:02"
+
+
+async def _wait_for(predicate) -> None:
+    async with asyncio.timeout(5):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture(name="coordinator")
+async def coordinator_fixture(
+    hass: HomeAssistant, fake_box: FakeInternetBox, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(events_module, "RETRY_MIN_SECONDS", 0.01)
+    fake_box.add_host(PHONE_MAC, ip="192.168.1.10", name="phone")
+    client = InternetBoxClient(hass, host=fake_box.host, password=PASSWORD, ssl=False)
+    coordinator = InternetBoxDataCoordinator(hass, client)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+    listener = InternetBoxEventListener(client, coordinator)
+    task = asyncio.get_running_loop().create_task(listener.async_run())
+    yield coordinator
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await coordinator.async_shutdown()
+
+
+def _host(coordinator: InternetBoxDataCoordinator, mac: str):
+    return coordinator.get_host(mac)
+
+
+async def test_changed_event_updates_host(
+    coordinator: InternetBoxDataCoordinator, fake_box: FakeInternetBox
+) -> None:
+    fake_box.push_event(
+        f"Devices.Device.{PHONE_MAC.upper()}", "changed", {"Active": False}
+    )
+
+    await _wait_for(lambda: _host(coordinator, PHONE_MAC).active is False)
+    assert _host(coordinator, PHONE_MAC).ip == "192.168.1.10"
+
+
+async def test_add_and_delete_events(
+    coordinator: InternetBoxDataCoordinator, fake_box: FakeInternetBox
+) -> None:
+    fake_box.push_event(
+        f"Devices.Device.{LAPTOP_MAC.upper()}",
+        "add",
+        {"Name": "laptop", "Active": True, "DeviceType": "Laptop"},
+    )
+    await _wait_for(lambda: _host(coordinator, LAPTOP_MAC) is not None)
+    assert _host(coordinator, LAPTOP_MAC).hostname == "laptop"
+
+    fake_box.push_event(f"Devices.Device.{PHONE_MAC.upper()}", "del", {})
+    await _wait_for(lambda: _host(coordinator, PHONE_MAC) is None)
+
+
+async def test_partial_add_event_reconciles_hosts(
+    coordinator: InternetBoxDataCoordinator, fake_box: FakeInternetBox
+) -> None:
+    fake_box.add_host(LAPTOP_MAC, name="laptop", device_type="Laptop")
+    fake_box.push_event(f"Devices.Device.{LAPTOP_MAC.upper()}", "add", {"Active": True})
+
+    await _wait_for(lambda: _host(coordinator, LAPTOP_MAC) is not None)
+    assert _host(coordinator, LAPTOP_MAC).type == "Laptop"
+
+
+async def test_malformed_event_does_not_stop_the_listener(
+    coordinator: InternetBoxDataCoordinator, fake_box: FakeInternetBox
+) -> None:
+    fake_box.push_event(
+        f"Devices.Device.{LAPTOP_MAC.upper()}", "changed", ["not", "a", "mapping"]
+    )
+    fake_box.push_event(
+        f"Devices.Device.{PHONE_MAC.upper()}", "changed", {"Active": False}
+    )
+
+    await _wait_for(lambda: _host(coordinator, PHONE_MAC).active is False)
+
+
+async def test_listener_resubscribes_after_unexpected_error(
+    coordinator: InternetBoxDataCoordinator,
+    fake_box: FakeInternetBox,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    apply_host_events = coordinator.async_apply_host_events
+    calls = 0
+
+    def _apply_once_broken(host_events):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("broken")
+        return apply_host_events(host_events)
+
+    monkeypatch.setattr(coordinator, "async_apply_host_events", _apply_once_broken)
+    fake_box.push_event(f"Devices.Device.{PHONE_MAC.upper()}", "changed", {})
+    await _wait_for(lambda: calls == 1)
+    fake_box.push_event(
+        f"Devices.Device.{PHONE_MAC.upper()}", "changed", {"Active": False}
+    )
+
+    await _wait_for(lambda: _host(coordinator, PHONE_MAC).active is False)
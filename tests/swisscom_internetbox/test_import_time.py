@@ -0,0 +1,74 @@
+"""Import cost of the integration, measured with ``python -X importtime``.
+
+The Home Assistant modules the integration builds on are imported first, as
+they are already loaded when Home Assistant sets the integration up; only
+what importing the integration adds on top is counted.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[2]
+
+PRELOADED = [
+    "voluptuous",
+    "homeassistant.config_entries",
+    "homeassistant.components.device_tracker",
+    "homeassistant.components.sensor",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+]
+INTEGRATION = [
+    "custom_components.swisscom_internetbox",
+    "custom_components.swisscom_internetbox.config_flow",
+    "custom_components.swisscom_internetbox.device_tracker",
+    "custom_components.swisscom_internetbox.sensor",
+]
+MARKER = "-- integration --"
+
+# Microseconds of self time of all modules the integration pulls in. About
+# 60 ms on a development machine; the rest is headroom for slower CI runners.
+IMPORT_BUDGET_US = 150_000
+
+
+def _import_integration() -> tuple[dict[str, int], set[str]]:
+    """Return the self time of each newly imported module, and sys.modules."""
+    code = "\n".join(
+        [
+            "import sys",
+            *(f"import {module}" for module in PRELOADED),
+            f"print({MARKER!r}, file=sys.stderr, flush=True)",
+            *(f"import {module}" for module in INTEGRATION),
+            "print('\\n'.join(sys.modules))",
+        ]
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    _, _, timings = result.stderr.partition(MARKER)
+    self_times = {}
+    for line in timings.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        self_times[name.strip()] = int(self_us)
+    return self_times, set(result.stdout.split())
+
+
+def test_import_time_within_budget() -> None:
+    self_times, modules = _import_integration()
+
+    assert "custom_components.swisscom_internetbox.sensor" in self_times
+    total = sum(self_times.values())
+    slowest = sorted(self_times.items(), key=lambda item: -item[1])[:5]
+    assert total < IMPORT_BUDGET_US, f"{total} us, slowest: {slowest}"
+    # The blocking client is only needed, and imported, with legacy_client.
+    assert "sc_inetbox_adapter" not in modules
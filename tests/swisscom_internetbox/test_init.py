@@ -0,0 +1,240 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from custom_components.swisscom_internetbox.const import (
+    CLIENT_LINGER_SECONDS,
+    CONF_HOST_TRAFFIC,
+    DOMAIN,
+)
+from custom_components.swisscom_internetbox.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from homeassistant.config_entries import SOURCE_USER, ConfigEntryState
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_SSL,
+    CONF_VERIFY_SSL,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from .simulator import PASSWORD, FakeInternetBox
+
+
+@pytest.fixture(name="entry")
+def entry_fixture(hass: HomeAssistant, fake_box: FakeInternetBox) -> MockConfigEntry:
+    fake_box.add_host("aa:bb:cc:dd:ee:01", ip="192.168.1.10", name="phone")
+    fake_box.add_host("aa:bb:cc:dd:ee:02", name="laptop", active=False)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=fake_box.device_info["SerialNumber"],
+        data={
+            CONF_HOST: fake_box.host,
+            CONF_PASSWORD: PASSWORD,
+            CONF_SSL: False,
+            CONF_VERIFY_SSL: False,
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_setup_creates_entities(
+    hass: HomeAssistant, entry: MockConfigEntry
+) -> None:
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    entity_registry = er.async_get(hass)
+    for mac in ("aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:02"):
+        assert entity_registry.async_get_entity_id("device_tracker", DOMAIN, mac)
+    assert hass.states.get("sensor.connected_devices").state == "2"
+    assert hass.states.get("sensor.online_devices").state == "1"
+    assert hass.states.get("sensor.link_state").state == "up"
+    assert entity_registry.async_get("sensor.hosts_request_latency").disabled
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["entry"]["data"][CONF_PASSWORD] == "**REDACTED**"
+    device_info = diagnostics["coordinator"]["payloads"]["device_info"]
+    for key in ("serial_number", "mac_address", "external_ip"):
+        assert device_info[key] == "**REDACTED**"
+    assert device_info["model_name"] == "IB3-00"
+    assert diagnostics["client"]["logins"] == 1
+    assert diagnostics["client"]["endpoints"]["/sysbus/Devices:get"]["requests"] == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_router_device_is_kept_when_device_info_arrives_late(
+    hass: HomeAssistant, entry: MockConfigEntry, fake_box: FakeInternetBox
+) -> None:
+    fake_box.errors["/sysbus/DeviceInfo:get"] = 500
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    device_registry = dr.async_get(hass)
+    device = device_registry.async_get_device(identifiers={(DOMAIN, entry.unique_id)})
+    assert device is not None
+    assert device.sw_version is None
+
+    del fake_box.errors["/sysbus/DeviceInfo:get"]
+    await hass.data[DOMAIN][entry.entry_id].async_refresh()
+    await hass.async_block_till_done()
+
+    device = device_registry.async_get_device(identifiers={(DOMAIN, entry.unique_id)})
+    assert device.model == "IB3-00"
+    assert device.sw_version == "14.00.52"
+    # The sensors stay on the same device; no orphan is left behind.
+    routers = [
+        device
+        for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id)
+        if device.via_device_id is None
+    ]
+    assert routers == [device]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_setup_from_snapshot_does_not_wait_for_the_box(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    fake_box: FakeInternetBox,
+    hass_storage,
+) -> None:
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.snapshot"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}.snapshot",
+        "data": {
+            "devices": [
+                {
+                    "mac": "aa:bb:cc:dd:ee:01",
+                    "ip": "192.168.1.10",
+                    "hostname": "phone",
+                    "active": True,
+                    "type": "Computer",
+                }
+            ],
+            "device_info": fake_box.device_info,
+            "wan_info": {"status": True, "data": {"LinkState": "down"}},
+            "dsl_info": None,
+        },
+    }
+    fake_box.latency = 0.5
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+
+    state = hass.states.get("sensor.link_state")
+    assert state.state == "down"
+    assert state.attributes["stale"] is True
+    assert hass.states.get("sensor.connected_devices").state == "1"
+
+    async with asyncio.timeout(5):
+        while hass.states.get("sensor.link_state").state != "up":
+            await asyncio.sleep(0.05)
+    assert "stale" not in hass.states.get("sensor.link_state").attributes
+    assert hass.states.get("sensor.connected_devices").state == "2"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_host_traffic_sensors(
+    hass: HomeAssistant, entry: MockConfigEntry, fake_box: FakeInternetBox, freezer
+) -> None:
+    hass.config_entries.async_update_entry(entry, options={CONF_HOST_TRAFFIC: True})
+    fake_box.stations = {"aa:bb:cc:dd:ee:01": (0, 0)}
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_registry = er.async_get(hass)
+    entity_id = entity_registry.async_get_entity_id(
+        "sensor", DOMAIN, "aa:bb:cc:dd:ee:01_download_rate"
+    )
+    assert entity_id
+    assert not entity_registry.async_get_entity_id(
+        "sensor", DOMAIN, "aa:bb:cc:dd:ee:02_download_rate"
+    )
+    tracker = entity_registry.async_get(
+        entity_registry.async_get_entity_id(
+            "device_tracker", DOMAIN, "aa:bb:cc:dd:ee:01"
+        )
+    )
+    assert entity_registry.async_get(entity_id).device_id == tracker.device_id
+
+    fake_box.stations = {"aa:bb:cc:dd:ee:01": (125_000, 1_250_000)}
+    freezer.tick(60)
+    await hass.data[DOMAIN][entry.entry_id].async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get(entity_id)
+    # 1.25 MB sent by the access point over 60 s, shown in Mbit/s.
+    assert float(state.state) == pytest.approx(1_250_000 * 8 / 60 / 1e6, rel=1e-4)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_entry_reuses_the_config_flow_session(
+    hass: HomeAssistant, fake_box: FakeInternetBox
+) -> None:
+    fake_box.add_host("aa:bb:cc:dd:ee:01", ip="192.168.1.10", name="phone")
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_HOST: fake_box.host,
+            CONF_PASSWORD: PASSWORD,
+            CONF_SSL: False,
+            CONF_VERIFY_SSL: False,
+        },
+    )
+    await hass.async_block_till_done()
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    entry = result["result"]
+    assert entry.state is ConfigEntryState.LOADED
+
+    # One login, and the device information of the flow seeded the entry.
+    assert fake_box.logins == 1
+    assert fake_box.requests.count("/sysbus/DeviceInfo:get") == 1
+    assert hass.states.get("sensor.software_version").state == "14.00.52"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_reload_reuses_session_and_unload_closes_it(
+    hass: HomeAssistant, entry: MockConfigEntry, fake_box: FakeInternetBox
+) -> None:
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.LOADED
+    assert fake_box.logins == 1
+    # The refresh right after the reload reuses the fresh status results.
+    assert fake_box.requests.count("/sysbus/NMC:getWANStatus") == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert "/ws:releaseContext" not in fake_box.requests
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + dt.timedelta(seconds=CLIENT_LINGER_SECONDS + 1)
+    )
+    await hass.async_block_till_done()
+    assert fake_box.requests.count("/ws:releaseContext") == 1
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from custom_components.swisscom_internetbox.jsonstream import StatusArrayParser
+
+HOSTS = [
+    {
+        "PhysAddress": "AA:BB:CC:DD:EE:01",
+        "Name": 'quote " and brace } in a name',
+        "Tags": "lan edev mac physical",
+        "Names": [{"Name": "phone", "Source": "dhcp"}],
+        "IPv4Address": [{"Address": "192.168.1.10", "Status": "reachable"}],
+    },
+    {"PhysAddress": "AA:BB:CC:DD:EE:02", "Name": "back\\slash\\", "Active": True},
+    {"PhysAddress": "AA:BB:CC:DD:EE:03", "Name": "[été]", "Children": []},
+]
+
+
+def _parse(body: bytes, chunk_size: int) -> tuple[list, object]:
+    items = []
+    parser = StatusArrayParser(items.append)
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start : start + chunk_size])
+    return items, parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100_000])
+def test_items_are_cut_across_chunk_boundaries(chunk_size: int) -> None:
+    body = json.dumps(
+        {"status": HOSTS, "errors": []}, indent=1, ensure_ascii=False
+    ).encode()
+
+    items, envelope = _parse(body, chunk_size)
+
+    assert items == HOSTS
+    assert envelope == {"status": [], "errors": []}
+
+
+def test_error_payload_is_returned_in_envelope() -> None:
+    body = json.dumps(
+        {"status": [], "errors": [{"error": 13, "description": "Permission denied"}]}
+    ).encode()
+
+    items, envelope = _parse(body, 5)
+
+    assert items == []
+    assert envelope["errors"][0]["description"] == "Permission denied"
+
+
+def test_only_the_status_array_is_cut() -> None:
+    body = json.dumps(
+        {"data": [{"x": 1}], "status": {"SerialNumber": "X"}, "other": [[1], [2]]}
+    ).encode()
+
+    items, envelope = _parse(body, 4)
+
+    assert items == []
+    assert envelope == json.loads(body)
+
+
+def test_reset_discards_a_partial_body() -> None:
+    items = []
+    parser = StatusArrayParser(items.append)
+    parser.feed(b'{"status": [{"a": 1}, {"b"')
+    parser.reset()
+    parser.feed(b'{"status": [{"c": 3}]}')
+
+    assert items == [{"a": 1}, {"c": 3}]
+    assert parser.close() == {"status": []}
+    assert parser.size == len(b'{"status": [{"c": 3}]}')
+
+
+def test_truncated_body_raises() -> None:
+    parser = StatusArrayParser(lambda item: None)
+    parser.feed(b'{"status": [{"a": 1}, {"b": 2')
+
+    with pytest.raises(ValueError):
+        parser.close()
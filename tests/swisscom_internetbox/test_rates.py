@@ -0,0 +1,81 @@
+from custom_components.swisscom_internetbox.rates import (
+    COUNTER_WRAP,
+    ByteRate,
+    HostTrafficRates,
+)
+
+
+def test_rate_is_smoothed_over_recent_samples() -> None:
+    rate = ByteRate(samples=3)
+    rate.add(0, 1_000)
+    assert rate.rate is None
+
+    rate.add(10, 11_000)
+    assert rate.rate == 8_000
+    rate.add(20, 11_000)
+    assert rate.rate == 4_000
+    # The oldest sample drops out of the window.
+    rate.add(30, 11_000)
+    assert rate.rate == 0
+
+
+def test_rate_survives_32_bit_wrap() -> None:
+    rate = ByteRate()
+    rate.add(0, COUNTER_WRAP - 500)
+    rate.add(10, 500)
+
+    assert rate.rate == 800
+
+
+def test_rate_restarts_after_counter_reset() -> None:
+    rate = ByteRate()
+    rate.add(0, 5_000_000)
+    rate.add(10, 6_000_000)
+    rate.add(20, 1_000)
+    assert rate.rate is None
+
+    rate.add(30, 2_000)
+    assert rate.rate == 800
+
+
+def test_rate_restarts_after_reset_of_64_bit_counter() -> None:
+    rate = ByteRate()
+    rate.add(0, 183_552_309_112)
+    rate.add(10, 1_000)
+    assert rate.rate is None
+
+    rate.add(20, 11_000)
+    assert rate.rate == 8_000
+
+
+def test_host_traffic_rates_in_one_pass() -> None:
+    rates = HostTrafficRates()
+    assert rates.update(0, {"aa": (0, 0), "bb": (1_000, 0)}) == set()
+
+    changed = rates.update(10, {"aa": (10_000, 1_000), "bb": (500, 0), "cc": (0, 0)})
+
+    assert changed == {"aa", "bb"}
+    assert rates.rates("aa") == (8_000, 800)
+    # A counter going backwards from the lower half is a reset, not a wrap.
+    assert rates.rates("bb") == (None, 0)
+    assert rates.rates("cc") == (None, None)
+    assert rates.rates("dd") == (None, None)
+
+    # A host without counters in a sample reads as unknown again.
+    assert rates.update(20, {"bb": (1_500, 0)}) == {"aa", "bb"}
+    assert rates.rates("aa") == (None, None)
+
+
+def test_host_traffic_rates_drop_hosts_that_left() -> None:
+    rates = HostTrafficRates()
+    rates.update(0, {"aa": (183_552_309_112, 0), "bb": (0, 0)})
+    rates.update(10, {"aa": (1_000, 1_000), "bb": (10_000, 0)})
+    # A reset from a 64-bit counter is not a wrap.
+    assert rates.rates("aa") == (None, 800)
+
+    # Rotating private MACs do not accumulate slots.
+    for i in range(100):
+        rates.update(20 + i, {"bb": (10_000, 0), f"mac{i}": (0, 0)})
+    assert len(rates._index) == 2
+    assert rates.rates("aa") == (None, None)
+    assert rates.rates("bb") == (0, 0)
@@ -0,0 +1,88 @@
+import asyncio
+
+from custom_components.swisscom_internetbox.metrics import ClientMetrics
+from custom_components.swisscom_internetbox.scheduler import Priority, RequestScheduler
+
+
+async def _request(
+    scheduler: RequestScheduler,
+    priority: Priority,
+    name: str,
+    started: list[str],
+    done: asyncio.Event,
+) -> None:
+    async with scheduler.async_slot(priority):
+        started.append(name)
+        await done.wait()
+
+
+async def test_queued_requests_start_by_priority() -> None:
+    metrics = ClientMetrics()
+    scheduler = RequestScheduler(1, metrics)
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async with scheduler.async_slot(Priority.STATUS):
+        tasks = [
+            asyncio.create_task(_request(scheduler, priority, name, started, release))
+            for priority, name in (
+                (Priority.DIAGNOSTICS, "dsl"),
+                (Priority.STATUS, "wan"),
+                (Priority.PRESENCE, "hosts"),
+            )
+        ]
+        await asyncio.sleep(0)
+        assert metrics.queue_depth == 3
+        assert started == []
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert started == ["hosts", "wan", "dsl"]
+    assert metrics.queue_depth == 0
+    assert metrics.max_queue_depth == 3
+    assert metrics.queued == 3
+
+
+async def test_slow_diagnostics_leave_a_slot_for_presence() -> None:
+    scheduler = RequestScheduler(2, ClientMetrics())
+    started: list[str] = []
+    release = asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(_request(scheduler, priority, name, started, release))
+        for priority, name in (
+            (Priority.DIAGNOSTICS, "dsl"),
+            (Priority.DIAGNOSTICS, "traffic"),
+            (Priority.PRESENCE, "hosts"),
+        )
+    ]
+    await asyncio.sleep(0)
+
+    # The second diagnostics request waits; presence gets the spare slot.
+    assert started == ["dsl", "hosts"]
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["dsl", "hosts", "traffic"]
+
+
+async def test_cancelled_waiter_gives_up_its_place() -> None:
+    scheduler = RequestScheduler(1, ClientMetrics())
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async with scheduler.async_slot(Priority.STATUS):
+        cancelled = asyncio.create_task(
+            _request(scheduler, Priority.PRESENCE, "cancelled", started, release)
+        )
+        waiting = asyncio.create_task(
+            _request(scheduler, Priority.DIAGNOSTICS, "dsl", started, release)
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+    release.set()
+    await waiting
+    assert started == ["dsl"]
+    assert cancelled.cancelled()